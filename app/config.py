@@ -1,38 +1,135 @@
 # app/config.py
 import os
-from dotenv import load_dotenv
+import functools
+import logging
+from types import MappingProxyType
 
-load_dotenv()
+# In production, prefer the frozen .env snapshot (see scripts/freeze_env.py) so startup
+# is a plain cached-bytecode import instead of a .env parse
+_IS_PRODUCTION = os.environ.get('ENVIRONMENT', 'development') == 'production'
+_FROZEN_ENV = None
+if _IS_PRODUCTION:
+    try:
+        from _env_frozen import ENV as _FROZEN_ENV
+    except ImportError:
+        _FROZEN_ENV = None
+
+if _FROZEN_ENV is not None:
+    # Real environment variables still win over frozen values, as with load_dotenv()
+    _ENV = {**_FROZEN_ENV, **os.environ}
+else:
+    # .env is a development convenience; in production the orchestrator provides the environment,
+    # so python-dotenv is neither imported nor run. Parse it only once per process tree
+    # (reloader children and forked workers inherit the flag).
+    if not _IS_PRODUCTION and not os.environ.get('_DOTENV_LOADED'):
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
+        os.environ['_DOTENV_LOADED'] = '1'
+    
+    # Snapshot the environment once so Config fields read from a plain dict
+    _ENV = dict(os.environ)
+
+@functools.lru_cache(maxsize=None)
+def _envint(key, default):
+    """Parse an integer setting once per key; repeated imports reuse the cached value"""
+    return int(_ENV.get(key, default))
+
+@functools.lru_cache(maxsize=None)
+def _envbool(key, default):
+    """Parse a boolean setting once per key ('1', 'true', 'yes', 'on' are true)"""
+    return str(_ENV.get(key, default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Run-once sentinels: Config values are fixed after import, so these results are stable
+_DIRS_CREATED = False
+_VALIDATED_RESULT = None
 
 class Config:
     # API Keys
-    GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+    GROQ_API_KEY = _ENV.get('GROQ_API_KEY')
     # OpenAI API key is now optional (only needed if you want to use OpenAI embeddings)
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', None)
+    OPENAI_API_KEY = _ENV.get('OPENAI_API_KEY', None)
+    
+    # Outbound LLM HTTP connection pool (shared keep-alive, HTTP/2)
+    LLM_HTTP_TIMEOUT = 30  # Seconds
+    LLM_HTTP_MAX_KEEPALIVE = 64
+    LLM_HTTP_MAX_CONNECTIONS = 256
+    LLM_BATCH_CONCURRENCY = 8  # Concurrent Groq calls per /query/batch request
+    LLM_CONTEXT_MAX_CHARS = 8000  # Total retrieved text per prompt (~2000 tokens at ~4 chars/token)
+    LLM_CONTEXT_DOC_MAX_CHARS = 2000  # Per-chunk cap, so one oversized chunk can't crowd out the rest
     
     # AWS Configuration
-    AWS_ACCESS_KEY = os.getenv('AWS_ACCESS_KEY')
-    AWS_SECRET_KEY = os.getenv('AWS_SECRET_KEY')
-    AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
-    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+    AWS_ACCESS_KEY = _ENV.get('AWS_ACCESS_KEY')
+    AWS_SECRET_KEY = _ENV.get('AWS_SECRET_KEY')
+    AWS_BUCKET_NAME = _ENV.get('AWS_BUCKET_NAME')
+    AWS_REGION = _ENV.get('AWS_REGION', 'us-east-1')
+    AWS_USE_ACCELERATION = False  # S3 Transfer Acceleration (must be enabled on the bucket; billed per GB)
+    S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024  # Files above this upload as parallel multipart parts
+    S3_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024  # Part size; keeps multi-GB files well under the 10,000-part limit
+    S3_MAX_CONCURRENCY = 8  # Parts in flight per upload or download
+    S3_IO_CHUNKSIZE = 1024 * 1024  # Per read()/write() chunk inside a transfer (s3transfer defaults to 256 KiB)
+    S3_UPLOAD_SPOOL_MAX = 32 * 1024 * 1024  # Non-seekable uploads are buffered in memory up to this, then on disk
+    S3_DOWNLOAD_SPOOL_MAX = 64 * 1024 * 1024  # Large downloads are buffered in memory up to this, then on disk
+    S3_UPLOAD_WORKERS = 4  # Background uploads running at once (per worker process)
+    # Pooled S3 connections per worker: every part of every concurrent upload (4 x 8) plus headroom
+    # for get/list/delete calls made alongside them
+    S3_MAX_POOL_CONNECTIONS = 50
+    S3_HEALTH_CACHE_SECONDS = 30  # /health and /storage info reuse one S3 check for this long
+    S3_UPLOAD_STATUS_MAX = 1000  # Finished upload statuses kept for /upload/status polling
+    
+    # Document Uploads
+    ALLOWED_DOCUMENT_EXTENSIONS = frozenset({'pdf', 'txt'})  # Lowercase, no dot
+    PDF_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)  # Processes for parallel per-page text extraction
+    PDF_PARALLEL_MIN_PAGES = 8  # Smaller PDFs are extracted in-process
     
     # Vector Database
     VECTOR_DB_PATH = 'vector_db'
+    # HNSW index settings; Chroma applies them only when the collection is first created.
+    # Embeddings are unit-length, so VECTOR_DB_HNSW_SPACE=ip is a valid override that ranks identically
+    # and skips the norm computation; cosine stays the default to keep current relevance scores.
+    VECTOR_DB_HNSW_METADATA = MappingProxyType({
+        'hnsw:space': 'cosine',
+        'hnsw:M': 32,
+        'hnsw:construction_ef': 200,
+        'hnsw:search_ef': 64
+    })
+    CHROMA_HOST = _ENV.get('CHROMA_HOST')  # Use a Chroma server instead of the embedded on-disk store
+    CHROMA_PORT = 8000
+    CHROMA_BATCH_SIZE = 200  # Documents per Chroma insert when adding large uploads
+    VECTOR_DB_PREFETCH = True  # posix_fadvise(WILLNEED) the persisted segments at startup
     
     # Audio Configuration
     AUDIO_UPLOAD_FOLDER = 'temp_audio'
     MAX_AUDIO_FILE_SIZE = 16 * 1024 * 1024  # 16MB
-    ALLOWED_AUDIO_EXTENSIONS = {'wav', 'mp3', 'flac', 'm4a', 'ogg'}
+    ALLOWED_AUDIO_EXTENSIONS = frozenset({'wav', 'mp3', 'flac', 'm4a', 'ogg'})  # Lowercase, no dot
+    ALLOWED_AUDIO_SUFFIXES = tuple(f'.{ext}' for ext in sorted(ALLOWED_AUDIO_EXTENSIONS))  # For str.endswith()
     
     # Speech Configuration
     WHISPER_MODEL = 'base'  # base, small, medium, large
+    WHISPER_GPU_COMPUTE_TYPE = 'int8_float16'  # faster-whisper quantization on CUDA
+    WHISPER_CPU_COMPUTE_TYPE = 'int8'  # faster-whisper quantization on CPU
+    WHISPER_BEAM_SIZE = 1  # Greedy decoding
+    
+    # TTS engine: 'piper' (local ONNX voices, falls back to gTTS if unavailable) or 'gtts'
+    TTS_ENGINE = _ENV.get('TTS_ENGINE', 'piper').lower()
+    
+    # Piper voices, language code -> ONNX model (each needs its .onnx.json config alongside)
+    PIPER_VOICES_DIR = _ENV.get('PIPER_VOICES_DIR', 'voices')
+    PIPER_VOICES = MappingProxyType({
+        'en': 'en_US-lessac-medium.onnx'
+    })
     
     # Google TTS Configuration (Updated from Coqui TTS)
     DEFAULT_TTS_LANGUAGE = 'en'  # Default language for Google TTS
     TTS_VOICE_SPEED = 1.0  # Not used by gTTS but kept for compatibility
+    TTS_PIPELINE_WORKERS = 4  # Parallel sentence synthesis in voice-to-voice
+    GTTS_HTTP_MAX_CONNECTIONS = 32  # Keep-alive connections to Google TTS shared by all gTTS calls
+    TTS_CACHE_FILE = 'tts_cache.sqlite3'  # Synthesized-audio cache by text hash, stored inside VECTOR_DB_PATH
+    TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Oldest clips are pruned past this total size
+    TTS_CACHE_MEMORY_ENTRIES = 256  # Hot clips (the fixed fallback answers) kept in process
     
     # Available TTS languages for Google TTS
-    AVAILABLE_TTS_LANGUAGES = {
+    # Read-only view; the language table is a constant shared by every worker
+    AVAILABLE_TTS_LANGUAGES = MappingProxyType({
         'en': 'English',
         'es': 'Spanish',
         'fr': 'French',
@@ -48,39 +145,89 @@ class Config:
         'nl': 'Dutch',
         'sv': 'Swedish',
         'no': 'Norwegian'
-    }
+    })
+    AVAILABLE_TTS_LANGUAGE_COUNT = len(AVAILABLE_TTS_LANGUAGES)
     
     # Logging Configuration
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVEL = _ENV.get('LOG_LEVEL', 'INFO')
+    LOG_LEVEL_NUM = logging.INFO
     LOG_FILE = 'app.log'
     LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT = 5
+    LOG_BUFFER_CAPACITY = 1024  # Records buffered before app.log is written
+    NO_COLOR = bool(_ENV.get('NO_COLOR'))  # https://no-color.org convention
+    LOG_SYSLOG_ADDRESS = _ENV.get('LOG_SYSLOG_ADDRESS', '/dev/log')  # Production sink: socket path or host:port
     
     # Flask Configuration
-    FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
-    FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))  # Changed from 8080 to 5000 (standard Flask)
-    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    FLASK_HOST = _ENV.get('FLASK_HOST', '0.0.0.0')
+    FLASK_PORT = 5000  # Changed from 8080 to 5000 (standard Flask)
+    FLASK_DEBUG = True
     
     # Document Processing
-    CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 1000))
-    CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 200))
+    CHUNK_SIZE = 1000
+    CHUNK_OVERLAP = 200
     
     # Model Configuration
-    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    EMBEDDING_MODEL = _ENV.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    EMBEDDING_BATCH_SIZE = 64  # Max chunks per coalesced encode() call across concurrent uploads; 128-256 on GPU
+    EMBEDDING_BATCH_WAIT_MS = 5  # How long the batcher waits for more uploads to join a batch
+    EMBEDDING_CACHE_FILE = 'embed_cache.sqlite3'  # Chunk/query embedding cache, stored inside VECTOR_DB_PATH
+    EMBEDDING_CACHE_MAX_ENTRIES = 200000  # ~300MB of 384-d float32 vectors on disk
+    EMBEDDING_CACHE_MEMORY_ENTRIES = 2048  # Hot vectors (repeated queries) kept in process
+    QUANTIZE_EMBEDDINGS = False  # INT8 dynamic quantization of the SentenceTransformer fallback (may shift recall slightly)
+    EMBEDDING_ONNX = True  # Prefer the INT8 ONNX Runtime export of EMBEDDING_MODEL (needs optimum[onnxruntime])
+    ONNX_EMBEDDING_DIR = 'models_cache/embeddings_onnx_int8'  # Exported + quantized model, built on first start
+    
+    # Semantic Response Cache (/query and /audio/voice-to-voice)
+    SEMANTIC_CACHE_MAX_ENTRIES = 1000
+    SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
+    SEMANTIC_CACHE_TTL = 3600  # Seconds
     
     # Environment Settings
-    ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+    ENVIRONMENT = _ENV.get('ENVIRONMENT', 'development')
     
     # Performance Settings
-    MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 10))
-    REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))
+    MAX_CONCURRENT_REQUESTS = 10
+    REQUEST_TIMEOUT = 30
     
     # Security Settings (for production)
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
+    SECRET_KEY = _ENV.get('SECRET_KEY', 'dev-key-change-in-production')
+    
+    @classmethod
+    def _load(cls):
+        """Parse typed (int/bool) settings from the env snapshot once and bind them"""
+        cls.FLASK_PORT = _envint('FLASK_PORT', cls.FLASK_PORT)
+        cls.FLASK_DEBUG = _envbool('FLASK_DEBUG', cls.FLASK_DEBUG)
+        cls.CHUNK_SIZE = _envint('CHUNK_SIZE', cls.CHUNK_SIZE)
+        cls.CHUNK_OVERLAP = _envint('CHUNK_OVERLAP', cls.CHUNK_OVERLAP)
+        cls.LLM_CONTEXT_MAX_CHARS = _envint('LLM_CONTEXT_MAX_CHARS', cls.LLM_CONTEXT_MAX_CHARS)
+        cls.LLM_CONTEXT_DOC_MAX_CHARS = _envint('LLM_CONTEXT_DOC_MAX_CHARS', cls.LLM_CONTEXT_DOC_MAX_CHARS)
+        cls.MAX_CONCURRENT_REQUESTS = _envint('MAX_CONCURRENT_REQUESTS', cls.MAX_CONCURRENT_REQUESTS)
+        cls.REQUEST_TIMEOUT = _envint('REQUEST_TIMEOUT', cls.REQUEST_TIMEOUT)
+        cls.EMBEDDING_BATCH_SIZE = _envint('EMBEDDING_BATCH_SIZE', cls.EMBEDDING_BATCH_SIZE)
+        cls.EMBEDDING_ONNX = _envbool('EMBEDDING_ONNX', cls.EMBEDDING_ONNX)
+        cls.QUANTIZE_EMBEDDINGS = _envbool('QUANTIZE_EMBEDDINGS', cls.QUANTIZE_EMBEDDINGS)
+        cls.CHROMA_PORT = _envint('CHROMA_PORT', cls.CHROMA_PORT)
+        cls.AWS_USE_ACCELERATION = _envbool('AWS_USE_ACCELERATION', cls.AWS_USE_ACCELERATION)
+        cls.TTS_CACHE_MAX_BYTES = _envint('TTS_CACHE_MAX_BYTES', cls.TTS_CACHE_MAX_BYTES)
+        
+        # Per-deployment HNSW tuning, e.g. VECTOR_DB_HNSW_SEARCH_EF=128 for higher recall
+        hnsw = dict(cls.VECTOR_DB_HNSW_METADATA)
+        hnsw['hnsw:space'] = _ENV.get('VECTOR_DB_HNSW_SPACE', hnsw['hnsw:space'])
+        for key in ('M', 'construction_ef', 'search_ef'):
+            hnsw[f'hnsw:{key}'] = _envint(f'VECTOR_DB_HNSW_{key.upper()}', hnsw[f'hnsw:{key}'])
+        cls.VECTOR_DB_HNSW_METADATA = MappingProxyType(hnsw)
+        
+        # Numeric level resolved once for setup_logging()
+        cls.LOG_LEVEL_NUM = getattr(logging, cls.LOG_LEVEL.upper(), logging.INFO)
     
     @staticmethod
     def create_directories():
         """Create necessary directories if they don't exist"""
+        global _DIRS_CREATED
+        if _DIRS_CREATED:
+            return
+        
         directories = [
             Config.VECTOR_DB_PATH,
             Config.AUDIO_UPLOAD_FOLDER,
@@ -92,20 +239,26 @@ class Config:
                 os.makedirs(directory, exist_ok=True)
             except Exception as e:
                 print(f"Warning: Could not create directory {directory}: {e}")
+        _DIRS_CREATED = True
     
     @staticmethod
     def validate_config():
         """Validate configuration settings"""
+        global _VALIDATED_RESULT
+        if _VALIDATED_RESULT is not None:
+            return _VALIDATED_RESULT
+        
         errors = []
         warnings = []
         
-        # Check required directories
-        if not os.path.exists(Config.VECTOR_DB_PATH):
-            try:
-                os.makedirs(Config.VECTOR_DB_PATH, exist_ok=True)
-                warnings.append(f"Created missing directory: {Config.VECTOR_DB_PATH}")
-            except Exception as e:
-                errors.append(f"Cannot create vector DB directory: {e}")
+        # Check required directories (a single mkdir attempt instead of exists() + makedirs())
+        try:
+            os.makedirs(Config.VECTOR_DB_PATH)
+            warnings.append(f"Created missing directory: {Config.VECTOR_DB_PATH}")
+        except FileExistsError:
+            pass
+        except OSError as e:
+            errors.append(f"Cannot create vector DB directory: {e}")
         
         # Check audio settings
         if Config.MAX_AUDIO_FILE_SIZE > 50 * 1024 * 1024:  # 50MB
@@ -122,7 +275,8 @@ class Config:
         if not Config.OPENAI_API_KEY:
             warnings.append("OPENAI_API_KEY not set - Will use free embeddings")
         
-        return errors, warnings
+        _VALIDATED_RESULT = (errors, warnings)
+        return _VALIDATED_RESULT
     
     @staticmethod
     def get_service_info():
@@ -134,13 +288,13 @@ class Config:
                 "cost": "Free"
             },
             "tts": {
-                "engine": "Google TTS (gTTS)",
+                "engine": "Piper (local ONNX)" if Config.TTS_ENGINE == 'piper' else "Google TTS (gTTS)",
                 "default_language": Config.DEFAULT_TTS_LANGUAGE,
-                "available_languages": len(Config.AVAILABLE_TTS_LANGUAGES),
+                "available_languages": Config.AVAILABLE_TTS_LANGUAGE_COUNT,
                 "cost": "Free"
             },
             "stt": {
-                "engine": "OpenAI Whisper",
+                "engine": "Whisper (faster-whisper / OpenAI Whisper)",
                 "model": Config.WHISPER_MODEL,
                 "cost": "Free"
             },
@@ -156,34 +310,50 @@ class Config:
     
     @staticmethod
     def print_config_summary():
-        """Print a summary of the current configuration"""
-        print("=" * 50)
-        print("APPLICATION CONFIGURATION SUMMARY")
-        print("=" * 50)
-        print(f"Environment: {Config.ENVIRONMENT}")
-        print(f"Vector DB Path: {Config.VECTOR_DB_PATH}")
-        print(f"Flask Host: {Config.FLASK_HOST}:{Config.FLASK_PORT}")
-        print(f"Debug Mode: {Config.FLASK_DEBUG}")
-        print(f"Log Level: {Config.LOG_LEVEL}")
-        print(f"Whisper Model: {Config.WHISPER_MODEL}")
-        print(f"Default TTS Language: {Config.DEFAULT_TTS_LANGUAGE}")
-        print(f"Embedding Model: {Config.EMBEDDING_MODEL}")
-        print("=" * 50)
+        """Log a summary of the current configuration as a single record"""
+        logger = logging.getLogger("config")
+        # Skip building the summary (and validation) when startup INFO logs are silenced
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        lines = [
+            "=" * 50,
+            "APPLICATION CONFIGURATION SUMMARY",
+            "=" * 50,
+            f"Environment: {Config.ENVIRONMENT}",
+            f"Vector DB Path: {Config.VECTOR_DB_PATH}",
+            f"Flask Host: {Config.FLASK_HOST}:{Config.FLASK_PORT}",
+            f"Debug Mode: {Config.FLASK_DEBUG}",
+            f"Log Level: {Config.LOG_LEVEL}",
+            f"Whisper Model: {Config.WHISPER_MODEL}",
+            f"Default TTS Language: {Config.DEFAULT_TTS_LANGUAGE}",
+            f"Embedding Model: {Config.EMBEDDING_MODEL}",
+            "=" * 50
+        ]
         
         # Validate and show any issues
         errors, warnings = Config.validate_config()
         
         if errors:
-            print("CONFIGURATION ERRORS:")
-            for error in errors:
-                print(f"  [ERROR] {error}")
+            lines.append("CONFIGURATION ERRORS:")
+            lines.extend(f"  [ERROR] {error}" for error in errors)
         
         if warnings:
-            print("CONFIGURATION WARNINGS:")
-            for warning in warnings:
-                print(f"  [WARNING] {warning}")
+            lines.append("CONFIGURATION WARNINGS:")
+            lines.extend(f"  [WARNING] {warning}" for warning in warnings)
         
         if not errors and not warnings:
-            print("[SUCCESS] Configuration validation passed")
+            lines.append("[SUCCESS] Configuration validation passed")
         
-        print("=" * 50)
\ No newline at end of file
+        lines.append("=" * 50)
+        logger.info("%s", "\n".join(lines))
+
+Config._load()
+
+# Module-level aliases for values read on request paths (LOAD_GLOBAL instead of a class attribute lookup)
+CHUNK_SIZE = Config.CHUNK_SIZE
+CHUNK_OVERLAP = Config.CHUNK_OVERLAP
+ALLOWED_AUDIO_EXTENSIONS = Config.ALLOWED_AUDIO_EXTENSIONS
+ALLOWED_DOCUMENT_EXTENSIONS = Config.ALLOWED_DOCUMENT_EXTENSIONS
+ALLOWED_AUDIO_SUFFIXES = Config.ALLOWED_AUDIO_SUFFIXES
+MAX_AUDIO_FILE_SIZE = Config.MAX_AUDIO_FILE_SIZE
\ No newline at end of file
@@ -0,0 +1,25 @@
+# app/gunicorn.conf.py
+# Production server settings; values come from the environment so the image stays configurable.
+import os
+
+# Flat imports (from config import Config) resolve against app/, while cwd stays at the
+# project root so vector_db/, logs/ and voices/ keep their usual locations
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+
+bind = f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', '8080')}"
+# Threaded workers: model inference is CPU-bound C code that never yields to a gevent hub,
+# so requests, the startup thread and the embedding/TTS pools need real OS threads.
+# gevent/eventlet workers are not supported (gunicorn patches threading for them)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+
+# LLM, STT and TTS calls can take a while; don't let the arbiter kill busy workers
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+
+# No preload: each worker imports main itself, so models load once per worker after the fork
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,27 @@
+# app/json_provider.py
+import orjson
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+
+def _default(obj):
+    """Named tuples (e.g. storage FileEntry) as JSON objects, everything else as Flask does"""
+    if isinstance(obj, tuple) and hasattr(obj, '_asdict'):
+        return obj._asdict()
+    return DefaultJSONProvider.default(obj)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify() and request.json"""
+
+    # NumPy arrays/scalars (embeddings, scores) and non-str dict keys serialize natively
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build the response body straight from orjson's bytes, skipping the str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self.OPTIONS)
+        return self._app.response_class(body, mimetype='application/json')
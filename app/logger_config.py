@@ -1,12 +1,50 @@
 # app/logger_config.py
 import logging
 import logging.handlers
+import atexit
+import functools
+import gzip
+import queue
+import shutil
+import time
 from datetime import datetime
 import os
 import sys
 from config import Config
 
-class ColoredFormatter(logging.Formatter):
+# Shared record layout; str.format style is cheaper per record than %-style
+LOG_FORMAT = '{asctime} | {name} | {levelname} | {funcName}:{lineno} | {message}'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Background listener that owns the file handlers (see setup_logging)
+_queue_listener = None
+_atexit_registered = False
+
+# Handlers are built on the first get_logger()/setup_logging() call, so import-only
+# paths (tests, CLI help) open no log files
+_logging_initialized = False
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the timestamp once per second instead of once per record"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, text) swapped as one tuple so console and listener threads never see a torn pair
+        self._cached_time = (None, '')
+    
+    def formatTime(self, record, datefmt=None):
+        # Without datefmt the default format includes milliseconds, which cannot be cached
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._cached_time
+        if second != cached_second:
+            cached_text = time.strftime(datefmt, self.converter(second))
+            self._cached_time = (second, cached_text)
+        return cached_text
+
+class ColoredFormatter(CachedTimeFormatter):
     """Custom formatter to add colors to log levels"""
     
     # ANSI color codes
@@ -20,27 +58,41 @@ class ColoredFormatter(logging.Formatter):
     
     RESET = '\033[0m'  # Reset color
     
+    # Level name -> colored level name (filled in once below the class)
+    COLORED_LEVELS = {}
+    
     def format(self, record):
-        # Get the original formatted message
-        original_format = super().format(record)
-        
-        # Get color for the log level
-        color = self.COLORS.get(record.levelname, self.RESET)
-        
-        # Add color to the log level only
-        colored_level = f"{color}{record.levelname}{self.RESET}"
-        
-        # Replace the level name with colored version
-        formatted_message = original_format.replace(record.levelname, colored_level)
-        
-        return formatted_message
+        # Color the level name on the record itself rather than scanning the formatted output,
+        # which also avoids recoloring words like "INFO" inside the message
+        original_levelname = record.levelname
+        record.levelname = self.COLORED_LEVELS.get(original_levelname, original_levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = original_levelname
 
-class WindowsSafeFormatter(logging.Formatter):
-    """Windows-safe formatter without emojis"""
+ColoredFormatter.COLORED_LEVELS = {
+    level: f"{color}{level}{ColoredFormatter.RESET}" for level, color in ColoredFormatter.COLORS.items()
+}
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that gzips each rolled-over log file"""
     
-    def format(self, record):
-        # Use simple text instead of emojis for Windows compatibility
-        return super().format(record)
+    def __init__(self, *args, compresslevel=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Level 1 keeps rollover cheap while still shrinking text logs ~10x
+        self.compresslevel = compresslevel
+        self.namer = self._gzip_name
+        self.rotator = self._gzip_rotate
+    
+    @staticmethod
+    def _gzip_name(name):
+        return f"{name}.gz"
+    
+    def _gzip_rotate(self, source, dest):
+        with open(source, 'rb') as source_file, gzip.open(dest, 'wb', compresslevel=self.compresslevel) as dest_file:
+            shutil.copyfileobj(source_file, dest_file)
+        os.remove(source)
 
 class AudioLogger:
     """Specialized logger for audio operations"""
@@ -49,49 +101,55 @@ class AudioLogger:
         self.logger = logging.getLogger(name)
         
     def log_audio_start(self, operation, filename=None):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if filename:
-            self.logger.info(f"[AUDIO] Starting {operation} for file: {filename}")
+            self.logger.info("[AUDIO] Starting %s for file: %s", operation, filename)
         else:
-            self.logger.info(f"[AUDIO] Starting {operation}")
+            self.logger.info("[AUDIO] Starting %s", operation)
     
     def log_audio_success(self, operation, duration=None):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if duration:
-            self.logger.info(f"[SUCCESS] {operation} completed successfully in {duration:.2f}s")
+            self.logger.info("[SUCCESS] %s completed successfully in %.2fs", operation, duration)
         else:
-            self.logger.info(f"[SUCCESS] {operation} completed successfully")
+            self.logger.info("[SUCCESS] %s completed successfully", operation)
     
     def log_audio_error(self, operation, error):
-        self.logger.error(f"[ERROR] {operation} failed: {str(error)}")
+        self.logger.error("[ERROR] %s failed: %s", operation, error)
+
+_IS_WINDOWS = sys.platform.startswith('win')
 
 def is_windows():
     """Check if running on Windows"""
-    return sys.platform.startswith('win')
+    return _IS_WINDOWS
 
 def setup_logging():
     """Set up the logging configuration with colors and file rotation"""
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
+    global _logging_initialized
     
     # Create root logger
     logger = logging.getLogger()
-    logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper()))
+    logger.setLevel(Config.LOG_LEVEL_NUM)
     
     # Clear any existing handlers
     logger.handlers.clear()
     
-    # Choose formatter based on platform
-    if is_windows():
-        # Use Windows-safe formatter without emojis
-        console_formatter = WindowsSafeFormatter(
-            fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+    # Choose formatter based on platform and whether the console can render colors
+    if is_windows() or Config.NO_COLOR or not sys.stderr.isatty():
+        # Use plain formatter (Windows, NO_COLOR, or output piped to a file/collector)
+        console_formatter = CachedTimeFormatter(
+            fmt=LOG_FORMAT,
+            datefmt=LOG_DATE_FORMAT,
+            style='{'
         )
     else:
         # Use colored formatter for Unix systems
         console_formatter = ColoredFormatter(
-            fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
+            fmt=LOG_FORMAT,
+            datefmt=LOG_DATE_FORMAT,
+            style='{'
         )
     
     # Console Handler
@@ -99,35 +157,123 @@ def setup_logging():
     console_handler.setFormatter(console_formatter)
     logger.addHandler(console_handler)
     
-    # File Handler with rotation (no colors in file)
-    file_handler = logging.handlers.RotatingFileHandler(
+    # Shared formatter for the background sinks (no colors)
+    sink_formatter = CachedTimeFormatter(
+        fmt=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT,
+        style='{'
+    )
+    
+    # In production, ship records straight to the syslog/collector sink instead of local files
+    sink_handlers = None
+    syslog_error = None
+    if Config.ENVIRONMENT == 'production':
+        try:
+            sink_handlers = (_build_syslog_handler(sink_formatter),)
+        except OSError as e:
+            syslog_error = e
+    
+    if sink_handlers is None:
+        sink_handlers = _build_file_handlers(sink_formatter)
+    
+    # Sink writes and rotation happen on the listener thread; request threads only enqueue
+    _start_queue_listener(logger, *sink_handlers)
+    
+    if syslog_error is not None:
+        logger.warning("[WARNING] Syslog unavailable at %s (%s), using local log files",
+                       Config.LOG_SYSLOG_ADDRESS, syslog_error)
+    
+    _logging_initialized = True
+    return logger
+
+def _build_file_handlers(formatter):
+    """Create the buffered app.log handler and the error.log handler"""
+    
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+    
+    # File Handler with gzip rotation (no colors in file)
+    file_handler = CompressingRotatingFileHandler(
         filename=f'logs/{Config.LOG_FILE}',
         maxBytes=Config.LOG_MAX_BYTES,
         backupCount=Config.LOG_BACKUP_COUNT,
         encoding='utf-8'  # Explicit UTF-8 encoding for file
     )
-    file_formatter = logging.Formatter(
-        fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(formatter)
     
-    # Error file handler for errors only
-    error_handler = logging.handlers.RotatingFileHandler(
+    # Error file handler for errors only; the file is not opened until the first error
+    # (the listener skips it for lower levels via respect_handler_level)
+    error_handler = CompressingRotatingFileHandler(
         filename='logs/error.log',
         maxBytes=Config.LOG_MAX_BYTES,
         backupCount=Config.LOG_BACKUP_COUNT,
-        encoding='utf-8'  # Explicit UTF-8 encoding for file
+        encoding='utf-8',  # Explicit UTF-8 encoding for file
+        delay=True
     )
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(file_formatter)
-    logger.addHandler(error_handler)
+    error_handler.setFormatter(formatter)
     
-    return logger
+    # Batch app.log writes; errors flush the buffer immediately and error.log stays unbuffered
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=Config.LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    
+    return buffered_file_handler, error_handler
+
+def _build_syslog_handler(formatter):
+    """Create a syslog handler for Config.LOG_SYSLOG_ADDRESS ('/dev/log' socket path or 'host:port')"""
+    address = Config.LOG_SYSLOG_ADDRESS
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        address = (host, int(port))
+    elif not os.path.exists(address):
+        # SysLogHandler only reports a missing socket on the first emit, so check up front
+        raise FileNotFoundError(f"syslog socket not found: {address}")
+    
+    syslog_handler = logging.handlers.SysLogHandler(address=address)
+    syslog_handler.setFormatter(formatter)
+    return syslog_handler
+
+def _start_queue_listener(logger, *handlers):
+    """Attach a QueueHandler to the logger and drain it into handlers on a background thread"""
+    global _queue_listener, _atexit_registered
+    
+    # Stop a listener from a previous setup_logging() call so its files are flushed and closed
+    _stop_queue_listener()
+    
+    if not _atexit_registered:
+        atexit.register(_stop_queue_listener)
+        _atexit_registered = True
+    
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+def _stop_queue_listener():
+    """Flush pending records and close the file handlers"""
+    global _queue_listener
+    
+    if _queue_listener is None:
+        return
+    
+    _queue_listener.stop()
+    for handler in _queue_listener.handlers:
+        # MemoryHandler flushes on close but leaves its target open
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+    _queue_listener = None
 
 def get_logger(name):
-    """Get a logger with the specified name"""
+    """Get a logger with the specified name, setting up logging on first use"""
+    if not _logging_initialized:
+        setup_logging()
     return logging.getLogger(name)
 
 def log_system_info():
@@ -152,35 +298,43 @@ def log_system_info():
 
 def log_request(func):
     """Decorator to log API requests"""
+    # Resolved once when the decorator is applied, not on every request; plain getLogger so
+    # decorating at import time does not trigger setup_logging()
+    logger = logging.getLogger("api")
+    name = func.__name__
+    
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger("api")
-        logger.info(f"[REQUEST] API Request: {func.__name__}")
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        if info_enabled:
+            logger.info("[REQUEST] API Request: %s", name)
         try:
             result = func(*args, **kwargs)
-            logger.info(f"[RESPONSE] API Response: {func.__name__} - Success")
+            if info_enabled:
+                logger.info("[RESPONSE] API Response: %s - Success", name)
             return result
         except Exception as e:
-            logger.error(f"[ERROR] API Error: {func.__name__} - {str(e)}")
+            logger.error("[ERROR] API Error: %s - %s", name, e)
             raise
     return wrapper
 
 # Utility functions for different log types
 def log_success(logger, message):
     """Log success message in a platform-safe way"""
-    logger.info(f"[SUCCESS] {message}")
+    logger.info("[SUCCESS] %s", message)
 
 def log_error(logger, message):
     """Log error message in a platform-safe way"""
-    logger.error(f"[ERROR] {message}")
+    logger.error("[ERROR] %s", message)
 
 def log_warning(logger, message):
     """Log warning message in a platform-safe way"""
-    logger.warning(f"[WARNING] {message}")
+    logger.warning("[WARNING] %s", message)
 
 def log_info(logger, message):
     """Log info message in a platform-safe way"""
-    logger.info(f"[INFO] {message}")
+    logger.info("[INFO] %s", message)
 
 def log_debug(logger, message):
     """Log debug message in a platform-safe way"""
-    logger.debug(f"[DEBUG] {message}")
\ No newline at end of file
+    logger.debug("[DEBUG] %s", message)
\ No newline at end of file
@@ -1,28 +1,39 @@
 # app/main.py
-from flask import Flask, request, render_template, jsonify, send_file
+from flask import Flask, Response, request, render_template, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
-import tempfile
+import io
+import gc
+import base64
 import time
+import uuid
+import orjson
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import configurations and logging
-from config import Config
+from config import Config, CHUNK_SIZE, CHUNK_OVERLAP, ALLOWED_AUDIO_EXTENSIONS, ALLOWED_DOCUMENT_EXTENSIONS, MAX_AUDIO_FILE_SIZE
 from logger_config import setup_logging, get_logger, log_system_info
+from json_provider import OrjsonProvider
 
 # Import services
 from models.vector_store import VectorStore
 from services.storage_service import S3Storage
 from services.llm_service import LLMService
 from services.audio_service import WhisperSTTService
-from services.speech_service import GoogleTTSService, SpeechService
+from services.speech_service import GoogleTTSService, PiperTTSService, SpeechService, SENTENCE_BOUNDARY
+from services.cache_service import SemanticCache, TTSAudioCache
 
 # Import document processing
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.schema import Document
+from services.pdf_extractor import extract_pdf_pages
+from services.text_chunker import FastChunker
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)  # orjson for jsonify() and request.json
 CORS(app)  # Enable CORS for frontend
 
 # Setup logging
@@ -35,44 +46,175 @@ log_system_info()
 # Create necessary directories
 Config.create_directories()
 
-# Initialize services
-logger.info("Initializing services...")
-
-try:
-    # Vector store
-    vector_store = VectorStore(Config.VECTOR_DB_PATH)
-    logger.info("Vector store initialized")
-    
-    # Storage service (with error handling for S3)
-    storage_service = None
+# Services are loaded on a background thread so the server can bind its port immediately;
+# requests other than /health and the main page get a 503 until services_ready is set
+vector_store = None
+storage_service = None
+llm_service = None
+response_cache = None
+stt_service = None
+tts_service = None
+tts_languages = {}
+speech_service = None
+services_ready = threading.Event()
+services_error = None
+
+def init_storage_service():
+    """Create the S3 storage service, or None to continue with local storage only"""
     try:
-        storage_service = S3Storage()
+        service = S3Storage()
         logger.info("S3 storage service initialized")
+        return service
     except Exception as storage_error:
-        logger.warning(f"S3 storage service failed: {str(storage_error)}")
+        logger.warning("S3 storage service failed: %s", storage_error)
         logger.info("Continuing with local file storage only")
-        storage_service = None
-    
-    # LLM service
-    llm_service = LLMService(vector_store)
-    logger.info("LLM service initialized")
-    
-    # Audio services
-    stt_service = WhisperSTTService()
-    logger.info("STT service initialized")
+        return None
+
+def init_tts_service():
+    """Create the configured TTS service, falling back to Google TTS"""
+    service = None
+    if Config.TTS_ENGINE == 'piper':
+        try:
+            service = PiperTTSService()
+        except Exception as tts_error:
+            logger.warning("Piper TTS unavailable, falling back to Google TTS: %s", tts_error)
+    if service is None:
+        service = GoogleTTSService()
+    logger.info("TTS service initialized (%s)", service.__class__.__name__)
     
-    tts_service = GoogleTTSService()
-    logger.info("TTS service initialized")
+    try:
+        service.audio_cache = TTSAudioCache(
+            os.path.join(Config.VECTOR_DB_PATH, Config.TTS_CACHE_FILE),
+            service.cache_namespace,
+            max_bytes=Config.TTS_CACHE_MAX_BYTES,
+            memory_entries=Config.TTS_CACHE_MEMORY_ENTRIES
+        )
+        logger.info("TTS audio cache initialized")
+    except Exception as cache_error:
+        logger.warning("TTS audio cache unavailable, synthesizing every request: %s", cache_error)
+    return service
+
+def prewarm_tts_cache(language=Config.DEFAULT_TTS_LANGUAGE):
+    """Synthesize the fixed fallback answers (whole and per sentence) so their first request is a cache hit"""
+    texts = []
+    for answer in LLMService.FIXED_ANSWERS:
+        texts.append(answer)
+        texts.extend(sentence for sentence in SENTENCE_BOUNDARY.split(answer) if sentence.strip())
     
-    # Combined speech service
-    speech_service = SpeechService(stt_service, tts_service)
-    logger.info("Speech service initialized")
+    for text in dict.fromkeys(texts):
+        try:
+            tts_service.text_to_speech_bytes(text, language)
+        except Exception as warm_error:
+            logger.warning("TTS cache pre-warm stopped: %s", warm_error)
+            return
+    logger.info("TTS cache pre-warmed with %d fixed phrases", len(texts))
+
+def initialize_services():
+    """Load independent services concurrently, then the ones that depend on the vector store"""
+    global vector_store, storage_service, llm_service, response_cache
+    global stt_service, tts_service, tts_languages, speech_service, services_error
     
-    logger.info("All available services initialized successfully")
+    logger.info("Initializing services...")
+    start_time = time.time()
     
-except Exception as e:
-    logger.error(f"Failed to initialize core services: {str(e)}")
-    raise
+    try:
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="service_init") as executor:
+            vector_store_future = executor.submit(VectorStore, Config.VECTOR_DB_PATH)
+            storage_future = executor.submit(init_storage_service)
+            stt_future = executor.submit(WhisperSTTService)
+            tts_future = executor.submit(init_tts_service)
+            
+            # Vector store
+            vector_store = vector_store_future.result().wait_until_ready()
+            logger.info("Vector store initialized")
+            vector_store.warmup()
+            
+            # LLM service
+            llm_service = LLMService(vector_store)
+            logger.info("LLM service initialized")
+            
+            # Semantic response cache (shares the vector store's embedding model and embedding cache)
+            response_cache = SemanticCache(
+                vector_store.embedding_batcher,
+                max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+                threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+                ttl_seconds=Config.SEMANTIC_CACHE_TTL,
+                generation=vector_store.get_generation
+            )
+            logger.info("Semantic response cache initialized")
+            
+            # Storage and audio services
+            storage_service = storage_future.result()
+            stt_service = stt_future.result()
+            logger.info("STT service initialized")
+            tts_service = tts_future.result()
+        
+        # The voice/language map is fixed once the TTS service is loaded
+        tts_languages = tts_service.get_available_languages()
+        
+        # Combined speech service
+        speech_service = SpeechService(stt_service, tts_service)
+        logger.info("Speech service initialized")
+        
+        if tts_service.audio_cache is not None:
+            tts_executor.submit(prewarm_tts_cache)
+        
+        # Models, clients and caches live for the whole process: move them to the permanent
+        # generation so full collections during requests no longer traverse them
+        gc.collect()
+        gc.freeze()
+        logger.info("Froze %d long-lived objects out of GC tracking", gc.get_freeze_count())
+        
+        services_ready.set()
+        logger.info("All available services initialized successfully in %.2fs", time.time() - start_time)
+        
+    except Exception as e:
+        services_error = str(e)
+        logger.error("Failed to initialize core services: %s", e)
+
+# Worker pool that synthesizes voice-to-voice answers sentence by sentence
+tts_executor = ThreadPoolExecutor(max_workers=Config.TTS_PIPELINE_WORKERS, thread_name_prefix="tts_pipeline")
+
+threading.Thread(target=initialize_services, name="service_init", daemon=True).start()
+
+# (second, ISO string) for /health; swapped as one tuple, so readers never see a torn pair
+_timestamp_cache = (0, "")
+
+def current_timestamp():
+    """ISO 8601 timestamp at one-second resolution, formatted at most once per second"""
+    global _timestamp_cache
+    second = int(time.time())
+    if _timestamp_cache[0] != second:
+        _timestamp_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _timestamp_cache[1]
+
+# Chunker specialized once for the configured chunk size/overlap and shared by every upload
+document_chunker = FastChunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+# Slack for multipart boundaries and form fields when checking Content-Length against the audio limit
+AUDIO_FORM_OVERHEAD = 64 * 1024
+
+# Background S3 uploads, so /upload returns once the vector store is updated
+s3_upload_executor = ThreadPoolExecutor(max_workers=Config.S3_UPLOAD_WORKERS, thread_name_prefix="s3_upload")
+s3_uploads = OrderedDict()  # upload id -> Future of the S3 upload result
+s3_uploads_lock = threading.Lock()
+
+@app.before_request
+def reject_oversized_audio():
+    """Refuse audio uploads whose request body is already over the limit, before parsing the form"""
+    if request.path.startswith('/audio/') and (request.content_length or 0) > MAX_AUDIO_FILE_SIZE + AUDIO_FORM_OVERHEAD:
+        return jsonify({'error': 'Audio file too large. Maximum size: 16MB'}), 413
+    return None
+
+@app.before_request
+def require_services():
+    """Answer 503 while services are still loading (or failed to load)"""
+    if services_ready.is_set() or request.endpoint in ('index', 'health_check', 'static'):
+        return None
+    return jsonify({
+        'error': 'Services failed to initialize' if services_error else 'Services are starting up, try again shortly',
+        'details': services_error
+    }), 503
 
 # Routes
 @app.route('/')
@@ -86,8 +228,15 @@ def health_check():
     """Health check endpoint"""
     logger.info("Performing health check")
     
+    if not services_ready.is_set():
+        return jsonify({
+            "timestamp": current_timestamp(),
+            "status": "error" if services_error else "starting",
+            "error": services_error
+        }), 503
+    
     health_status = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": current_timestamp(),
         "status": "healthy",
         "services": {
             "vector_store": vector_store.health_check(),
@@ -106,50 +255,174 @@ def health_check():
     
     return jsonify(health_status), 200 if core_healthy else 503
 
-def process_document(file):
-    """Process document based on file type and return text chunks"""
-    temp_dir = tempfile.mkdtemp()
-    temp_path = os.path.join(temp_dir, file.filename)
+def lookup_cached_response(question, start_time):
+    """
+    Look a question up in the semantic cache
     
+    Returns:
+        tuple: (query_vector, cached_response) - query_vector is None when the cache is
+            unavailable, cached_response is None on a miss
+    """
     try:
-        logger.info(f"Processing document: {file.filename}")
+        query_vector = response_cache.embed(question)
+    except Exception as cache_error:
+        logger.warning("Semantic cache unavailable, querying LLM directly: %s", cache_error)
+        return None, None
+    
+    cached_response = response_cache.lookup(query_vector)
+    if cached_response is None:
+        return query_vector, None
+    
+    logger.info("Semantic cache hit - skipping LLM call")
+    return query_vector, dict(cached_response, query=question, response_time=time.time() - start_time, cache_hit=True)
+
+def cache_response(query_vector, response):
+    """Store a freshly generated response (not errors or the instant "no documents" replies)"""
+    if query_vector is not None and "error" not in response and response.get("response_time", 0) > 0:
+        response_cache.store(query_vector, response)
+
+def get_llm_response(question, include_sources=True):
+    """Answer a question, serving semantically equivalent recent questions from the cache"""
+    query_vector, response = lookup_cached_response(question, time.time())
+    
+    if response is None:
+        # Always fetch sources on a miss so the cached entry can serve either kind of request
+        response = llm_service.get_response(question, include_sources=True)
+        cache_response(query_vector, response)
+        response = dict(response, cache_hit=False)
+    
+    if not include_sources:
+        response["sources"] = []
+    return response
+
+def get_llm_responses(questions, include_sources=True):
+    """Answer several questions, serving cache hits and sending the misses to the LLM as one concurrent batch"""
+    start_time = time.time()
+    lookups = [lookup_cached_response(question, start_time) for question in questions]
+    misses = [i for i, (_, response) in enumerate(lookups) if response is None]
+    
+    responses = [response for _, response in lookups]
+    if misses:
+        generated = llm_service.get_responses([questions[i] for i in misses], include_sources=True)
+        for i, response in zip(misses, generated):
+            cache_response(lookups[i][0], response)
+            responses[i] = dict(response, cache_hit=False)
+    
+    if not include_sources:
+        responses = [dict(response, sources=[]) for response in responses]
+    return responses
+
+def stream_llm_response(question):
+    """Stream answer events like LLMService.stream_response, serving cache hits as a single token"""
+    query_vector, cached_response = lookup_cached_response(question, time.time())
+    
+    if cached_response is not None:
+        yield {"token": cached_response["answer"]}
+        yield dict(cached_response, done=True, answer_replaced=False)
+        return
+    
+    for event in llm_service.stream_response(question, include_sources=True):
+        if event.get("done"):
+            cache_response(query_vector, {key: value for key, value in event.items() if key not in ("done", "answer_replaced")})
+            event = dict(event, cache_hit=False)
+        yield event
+
+def synthesize_streamed_answer(events, language="en"):
+    """
+    Convert a streamed answer to speech, synthesizing each finished sentence on the
+    TTS pool while the LLM is still generating the rest
+    
+    Returns:
+        tuple: (final response event, base64 audio of the full answer in tts_service.audio_format)
+    """
+    futures = []
+    pending_text = ""
+    final_event = None
+    
+    for event in events:
+        if "token" in event:
+            pending_text += event["token"]
+            *sentences, pending_text = SENTENCE_BOUNDARY.split(pending_text)
+            for sentence in sentences:
+                if sentence.strip():
+                    futures.append(tts_executor.submit(tts_service.text_to_speech_bytes, sentence, language))
+        if event.get("done"):
+            final_event = event
+    
+    if final_event.get("answer_replaced"):
+        # The streamed text was discarded, so speak the final answer instead
+        for future in futures:
+            future.cancel()
+        futures = [tts_executor.submit(tts_service.text_to_speech_bytes, final_event["answer"], language)]
+    elif pending_text.strip():
+        futures.append(tts_executor.submit(tts_service.text_to_speech_bytes, pending_text, language))
+    
+    # Per-sentence clips are joined in the TTS engine's own format (MP3 frames, or WAV PCM frames).
+    # The joined clip is a temporary, freed before the encoded bytes are copied into a str
+    audio_base64 = base64.b64encode(tts_service.combine_audio([future.result() for future in futures]))
+    return final_event, audio_base64.decode('ascii')
+
+def submit_s3_upload(data, filename):
+    """Start uploading a document's bytes to S3 in the background and return its upload id"""
+    upload_id = uuid.uuid4().hex
+    future = s3_upload_executor.submit(storage_service.upload_file, io.BytesIO(data), filename, file_size=len(data))
+    
+    with s3_uploads_lock:
+        s3_uploads[upload_id] = future
+        # Forget the oldest finished uploads once the table is full
+        while len(s3_uploads) > Config.S3_UPLOAD_STATUS_MAX:
+            oldest_id, oldest = next(iter(s3_uploads.items()))
+            if not oldest.done():
+                break
+            del s3_uploads[oldest_id]
+    
+    return upload_id
+
+def get_s3_upload_status(upload_id):
+    """Return the status of a background S3 upload, or None for an unknown id"""
+    with s3_uploads_lock:
+        future = s3_uploads.get(upload_id)
+    
+    if future is None:
+        return None
+    if not future.done():
+        return {"status": "pending", "storage": "s3"}
+    
+    try:
+        result = future.result()
+    except Exception as e:
+        result = {"success": False, "error": "Upload failed", "details": str(e)}
+    return dict(result, status="completed" if result.get("success") else "failed", storage="s3")
+
+def process_document(file):
+    """Process document based on file type; returns (text chunks, raw upload bytes)"""
+    try:
+        logger.info("Processing document: %s", file.filename)
         
-        # Save file temporarily
-        file.save(temp_path)
+        # Read the upload once in memory; the same bytes are handed on to the S3 upload
+        data = file.read()
         
         # Process based on file type
-        if file.filename.lower().endswith('.pdf'):
-            loader = PyPDFLoader(temp_path)
-            documents = loader.load()
-        elif file.filename.lower().endswith('.txt'):
-            loader = TextLoader(temp_path, encoding='utf-8')
-            documents = loader.load()
+        file_ext = os.path.splitext(file.filename)[1][1:].lower()
+        if file_ext == 'pdf':
+            documents = [
+                Document(page_content=text, metadata={'source': file.filename, 'page': page_number})
+                for page_number, text in enumerate(extract_pdf_pages(data))
+            ]
+        elif file_ext == 'txt':
+            documents = [Document(page_content=data.decode('utf-8'), metadata={'source': file.filename})]
         else:
             raise ValueError(f"Unsupported file type: {file.filename}")
 
         # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
-        )
-        text_chunks = text_splitter.split_documents(documents)
+        text_chunks = document_chunker.split_documents(documents)
         
-        logger.info(f"Document processed into {len(text_chunks)} chunks")
-        return text_chunks
+        logger.info("Document processed into %s chunks", len(text_chunks))
+        return text_chunks, data
         
     except Exception as e:
-        logger.error(f"Error processing document {file.filename}: {str(e)}")
+        logger.error("Error processing document %s: %s", file.filename, e)
         raise
-        
-    finally:
-        # Clean up temp file
-        try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
-        except Exception as cleanup_error:
-            logger.warning(f"Cleanup error: {cleanup_error}")
 
 @app.route('/upload', methods=['POST'])
 def upload_document():
@@ -164,33 +437,36 @@ def upload_document():
             return jsonify({'error': 'No file selected'}), 400
 
         # Check file extension
-        allowed_extensions = ['.txt', '.pdf']
-        if not any(file.filename.lower().endswith(ext) for ext in allowed_extensions):
+        file_ext = os.path.splitext(file.filename)[1][1:].lower()
+        if file_ext not in ALLOWED_DOCUMENT_EXTENSIONS:
             return jsonify({
-                'error': f'Only {", ".join(allowed_extensions)} files are supported'
+                'error': f'Only {", ".join("." + ext for ext in sorted(ALLOWED_DOCUMENT_EXTENSIONS))} files are supported'
             }), 400
 
         # Process the document
-        text_chunks = process_document(file)
+        text_chunks, data = process_document(file)
 
         # Try to upload to S3 if available, otherwise save locally
         upload_result = {"success": True, "storage": "local", "message": "File processed successfully"}
         
         if storage_service:
             try:
-                file.seek(0)  # Reset file pointer
-                upload_result = storage_service.upload_file(file, file.filename)
-                upload_result["storage"] = "s3"
+                # Reuse the bytes already read (no second copy); they outlive the request's file stream
+                upload_id = submit_s3_upload(data, file.filename)
+                upload_result = {"status": "pending", "storage": "s3", "upload_id": upload_id}
             except Exception as s3_error:
-                logger.warning(f"S3 upload failed, using local storage: {s3_error}")
+                logger.warning("S3 upload failed, using local storage: %s", s3_error)
                 upload_result["storage"] = "local"
                 upload_result["s3_error"] = str(s3_error)
         
-        # Add to vector store
+        # Add to vector store while the S3 upload runs
         if not vector_store.add_documents(text_chunks):
             return jsonify({'error': 'Failed to add documents to vector store'}), 500
+        
+        # New content can change answers, so drop cached responses
+        response_cache.invalidate()
 
-        logger.info(f"Upload successful: {file.filename}")
+        logger.info("Upload successful: %s", file.filename)
         return jsonify({
             'success': True,
             'message': 'File uploaded and processed successfully',
@@ -200,9 +476,17 @@ def upload_document():
         })
 
     except Exception as e:
-        logger.error(f"Upload error: {str(e)}")
+        logger.error("Upload error: %s", e)
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+@app.route('/upload/status/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Poll the status of a background S3 upload started by /upload"""
+    status = get_s3_upload_status(upload_id)
+    if status is None:
+        return jsonify({'error': 'Unknown upload id'}), 404
+    return jsonify({'success': True, 'upload_id': upload_id, 'storage_info': status})
+
 @app.route('/query', methods=['POST'])
 def query():
     """Process text query"""
@@ -218,8 +502,8 @@ def query():
             
         include_sources = data.get('include_sources', True)
         
-        logger.info(f"Processing query: {question[:50]}...")
-        response = llm_service.get_response(question, include_sources=include_sources)
+        logger.info("Processing query: %s...", question[:50])
+        response = get_llm_response(question, include_sources=include_sources)
         
         logger.info("Query processed successfully")
         return jsonify({
@@ -228,9 +512,68 @@ def query():
         })
 
     except Exception as e:
-        logger.error(f"Query error: {str(e)}")
+        logger.error("Query error: %s", e)
         return jsonify({'error': f'Query failed: {str(e)}'}), 500
 
+@app.route('/query/batch', methods=['POST'])
+def query_batch():
+    """Process several text queries in one request, answering them concurrently"""
+    logger.info("Batch query request received")
+    try:
+        data = request.json
+        questions = data.get('questions') if data else None
+        if not isinstance(questions, list) or not questions:
+            return jsonify({'error': 'No questions provided'}), 400
+        if not all(isinstance(question, str) and question.strip() for question in questions):
+            return jsonify({'error': 'Questions cannot be empty'}), 400
+        
+        include_sources = data.get('include_sources', True)
+        
+        logger.info("Processing %d queries", len(questions))
+        responses = get_llm_responses(questions, include_sources=include_sources)
+        
+        logger.info("Batch query processed successfully")
+        return jsonify({
+            'success': True,
+            'responses': responses
+        })
+    
+    except Exception as e:
+        logger.error("Batch query error: %s", e)
+        return jsonify({'error': f'Batch query failed: {str(e)}'}), 500
+
+@app.route('/query/stream', methods=['GET', 'POST'])
+def query_stream():
+    """Stream a text query answer as Server-Sent Events, token by token"""
+    logger.info("Streaming query request received")
+    # POST takes a JSON body like /query; GET (query string) works with the browser's EventSource
+    data = (request.get_json(silent=True) if request.method == 'POST' else request.args) or {}
+    question = data.get('question', '')
+    if not question.strip():
+        return jsonify({'error': 'No question provided'}), 400
+    
+    include_sources = data.get('include_sources', True)
+    if isinstance(include_sources, str):
+        include_sources = include_sources.lower() == 'true'
+    
+    def generate():
+        for event in stream_llm_response(question):
+            if not event.get("done"):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+                continue
+            
+            # Final event: the full response; clients should show its answer if answer_replaced
+            if not include_sources:
+                event = dict(event, sources=[])
+            yield b"event: done\ndata: " + orjson.dumps(dict(event, success="error" not in event)) + b"\n\n"
+        logger.info("Streaming query completed")
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/audio/transcribe', methods=['POST'])
 def transcribe_audio():
     """Transcribe audio to text using Whisper"""
@@ -244,22 +587,22 @@ def transcribe_audio():
             return jsonify({'error': 'No audio file selected'}), 400
         
         # Check file extension
-        file_ext = audio_file.filename.lower().split('.')[-1]
-        if file_ext not in Config.ALLOWED_AUDIO_EXTENSIONS:
+        file_ext = os.path.splitext(audio_file.filename)[1][1:].lower()
+        if file_ext not in ALLOWED_AUDIO_EXTENSIONS:
             return jsonify({
-                'error': f'Unsupported audio format. Supported: {", ".join(Config.ALLOWED_AUDIO_EXTENSIONS)}'
+                'error': f'Unsupported audio format. Supported: {", ".join(ALLOWED_AUDIO_EXTENSIONS)}'
             }), 400
         
-        # Check file size
-        audio_file.seek(0, 2)  # Seek to end
-        file_size = audio_file.tell()
-        audio_file.seek(0)  # Reset
+        # Check file size (seek/tell on the spooled upload, no data is read)
+        audio_file.stream.seek(0, os.SEEK_END)
+        file_size = audio_file.stream.tell()
+        audio_file.stream.seek(0)
         
-        if file_size > Config.MAX_AUDIO_FILE_SIZE:
-            return jsonify({'error': 'Audio file too large. Maximum size: 16MB'}), 400
+        if file_size > MAX_AUDIO_FILE_SIZE:
+            return jsonify({'error': 'Audio file too large. Maximum size: 16MB'}), 413
         
-        # Transcribe audio
-        result = stt_service.transcribe_audio_bytes(audio_file.read(), audio_file.filename)
+        # Transcribe straight from the upload stream instead of copying it into a bytes object
+        result = stt_service.transcribe_audio_stream(audio_file.stream, audio_file.filename)
         
         logger.info("Audio transcription completed successfully")
         return jsonify({
@@ -267,16 +610,17 @@ def transcribe_audio():
             'transcription': result['text'],
             'language': result['language'],
             'duration': result['duration'],
+            'audio_duration': result.get('audio_duration'),
             'segments': result.get('segments', [])
         })
 
     except Exception as e:
-        logger.error(f"Audio transcription error: {str(e)}")
+        logger.error("Audio transcription error: %s", e)
         return jsonify({'error': f'Transcription failed: {str(e)}'}), 500
 
 @app.route('/audio/synthesize', methods=['POST'])
 def synthesize_speech():
-    """Convert text to speech using Google TTS"""
+    """Convert text to speech using the configured TTS engine"""
     logger.info("Speech synthesis request received")
     try:
         data = request.json
@@ -291,10 +635,9 @@ def synthesize_speech():
         format_type = data.get('format', 'base64')  # 'base64' or 'file'
         
         # Validate language
-        available_languages = tts_service.get_available_languages()
-        if language not in available_languages:
+        if language not in tts_languages:
             return jsonify({
-                'error': f'Unsupported language: {language}. Available: {list(available_languages.keys())}'
+                'error': f'Unsupported language: {language}. Available: {list(tts_languages.keys())}'
             }), 400
         
         if format_type == 'base64':
@@ -306,6 +649,7 @@ def synthesize_speech():
                 'success': True,
                 'audio_data': audio_base64,
                 'format': 'base64',
+                'audio_mimetype': tts_service.mimetype,
                 'text': text,
                 'language': language
             })
@@ -317,15 +661,15 @@ def synthesize_speech():
             return send_file(
                 audio_path,
                 as_attachment=True,
-                download_name=f'speech_{int(time.time())}.mp3',  # gTTS outputs MP3
-                mimetype='audio/mpeg'
+                download_name=f'speech_{int(time.time())}.{tts_service.audio_format}',
+                mimetype=tts_service.mimetype
             )
         
         else:
             return jsonify({'error': 'Invalid format. Use "base64" or "file"'}), 400
 
     except Exception as e:
-        logger.error(f"Speech synthesis error: {str(e)}")
+        logger.error("Speech synthesis error: %s", e)
         return jsonify({'error': f'Speech synthesis failed: {str(e)}'}), 500
 
 @app.route('/audio/voice-to-voice', methods=['POST'])
@@ -347,21 +691,18 @@ def voice_to_voice():
         logger.info("Starting voice-to-voice pipeline")
         start_time = time.time()
         
-        transcription_result = stt_service.transcribe_audio_bytes(audio_file.read(), audio_file.filename)
+        transcription_result = stt_service.transcribe_audio_stream(audio_file.stream, audio_file.filename)
         user_text = transcription_result['text']
         
         if not user_text.strip():
             return jsonify({'error': 'No speech detected in audio'}), 400
         
-        # Step 2: Get LLM response
-        logger.info(f"Processing question: {user_text[:50]}...")
-        llm_response = llm_service.get_response(user_text, include_sources=include_sources)
+        # Steps 2 and 3: Stream the LLM response and convert it to speech sentence by sentence,
+        # so TTS runs while the rest of the answer is still being generated
+        logger.info("Processing question: %s...", user_text[:50])
+        llm_response, audio_response = synthesize_streamed_answer(stream_llm_response(user_text), language=language)
         response_text = llm_response['answer']
         
-        # Step 3: Convert response to speech
-        logger.info("Converting response to speech")
-        audio_response = tts_service.text_to_speech_base64(response_text, language=language)
-        
         total_time = time.time() - start_time
         
         logger.info("Voice-to-voice pipeline completed successfully")
@@ -370,6 +711,7 @@ def voice_to_voice():
             'user_speech': user_text,
             'ai_response_text': response_text,
             'ai_response_audio': audio_response,
+            'ai_response_audio_mimetype': tts_service.mimetype,
             'transcription_language': transcription_result['language'],
             'output_language': language,
             'processing_time': {
@@ -381,7 +723,7 @@ def voice_to_voice():
         })
 
     except Exception as e:
-        logger.error(f"Voice-to-voice error: {str(e)}")
+        logger.error("Voice-to-voice error: %s", e)
         return jsonify({'error': f'Voice-to-voice pipeline failed: {str(e)}'}), 500
 
 @app.route('/audio/info', methods=['GET'])
@@ -401,7 +743,7 @@ def audio_info():
         })
     
     except Exception as e:
-        logger.error(f"Error getting audio info: {str(e)}")
+        logger.error("Error getting audio info: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/services/info', methods=['GET'])
@@ -417,27 +759,40 @@ def services_info():
                 "note": "Cloud storage available" if storage_service else "Using local file storage only"
             },
             'llm': llm_service.get_model_info() if hasattr(llm_service, 'get_model_info') else {},
+            'response_cache': response_cache.get_stats(),
             'audio': {
                 'stt': stt_service.get_model_info() if hasattr(stt_service, 'get_model_info') else {},
                 'tts': tts_service.get_model_info() if hasattr(tts_service, 'get_model_info') else {}
             }
         })
     except Exception as e:
-        logger.error(f"Error getting services info: {str(e)}")
+        logger.error("Error getting services info: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Clear the semantic response cache"""
+    try:
+        removed = response_cache.invalidate()
+        return jsonify({
+            'success': True,
+            'entries_removed': removed
+        })
+    except Exception as e:
+        logger.error("Error invalidating response cache: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/tts/languages', methods=['GET'])
 def get_tts_languages():
     """Get available TTS languages"""
     try:
-        languages = tts_service.get_available_languages()
         return jsonify({
             'success': True,
-            'languages': languages,
+            'languages': tts_languages,
             'default_language': 'en'
         })
     except Exception as e:
-        logger.error(f"Error getting TTS languages: {str(e)}")
+        logger.error("Error getting TTS languages: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.errorhandler(404)
@@ -446,7 +801,7 @@ def not_found(error):
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"Internal server error: {str(error)}")
+    logger.error("Internal server error: %s", error)
     return jsonify({'error': 'Internal server error'}), 500
 
 @app.errorhandler(413)
@@ -454,11 +809,11 @@ def file_too_large(error):
     logger.error("File too large error")
     return jsonify({'error': 'File too large'}), 413
 
+# Development server only; production runs under gunicorn (see wsgi.py and gunicorn.conf.py)
 if __name__ == '__main__':
     try:
         logger.info("Starting Flask application")
-        logger.info(f"Running on http://{Config.FLASK_HOST}:{Config.FLASK_PORT}")
-        logger.info("Storage: S3" if storage_service else "Storage: Local files only")
+        logger.info("Running on http://%s:%s", Config.FLASK_HOST, Config.FLASK_PORT)
         
         app.run(
             host=Config.FLASK_HOST,
@@ -466,5 +821,5 @@ if __name__ == '__main__':
             debug=Config.FLASK_DEBUG
         )
     except Exception as e:
-        logger.error(f"Failed to start application: {str(e)}")
+        logger.error("Failed to start application: %s", e)
         raise
\ No newline at end of file
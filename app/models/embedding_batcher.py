@@ -0,0 +1,124 @@
+# app/models/embedding_batcher.py
+import queue
+import threading
+import time
+from logger_config import get_logger
+
+class _EmbeddingJob:
+    """One embed_documents() call waiting for its slice of a coalesced batch"""
+    __slots__ = ("texts", "event", "vectors", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.event = threading.Event()
+        self.vectors = None
+        self.error = None
+
+class EmbeddingBatcher:
+    """
+    Micro-batching wrapper around a LangChain embeddings object
+
+    Concurrent embed_documents() calls (e.g. parallel /upload requests) are queued and
+    coalesced by a daemon thread into one encode call of up to max_batch texts, then
+    the vectors are scattered back to each caller. embed_query() misses go through the same
+    queue, so queries arriving within max_wait_ms of each other share one forward pass.
+    With a ChunkEmbeddingCache, only texts it hasn't seen before reach the model.
+    """
+
+    def __init__(self, embeddings, max_batch=64, max_wait_ms=5, cache=None):
+        self.logger = get_logger("embedding_batcher")
+        self.embeddings = embeddings
+        self.cache = cache
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding_batcher", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts):
+        """Embed texts, serving repeats from the cache and batching the rest through the shared queue"""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        if self.cache is None:
+            return self._embed_batched(texts)
+
+        vectors = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._embed_batched(missing_texts)
+            self.cache.put_many(missing_texts, computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+
+        if len(missing) < len(texts):
+            self.logger.debug("[EMBED] %d of %d chunks served from the embedding cache", len(texts) - len(missing), len(texts))
+
+        return vectors
+
+    def _embed_batched(self, texts):
+        """Queue texts for the worker, blocking until this caller's vectors are ready"""
+        job = _EmbeddingJob(texts)
+        self._queue.put(job)
+        job.event.wait()
+
+        if job.error is not None:
+            raise job.error
+        return job.vectors
+
+    def embed_query(self, text):
+        """Embed a single query, reusing cached vectors and coalescing misses with concurrent queries"""
+        if self.cache is None:
+            return self._embed_batched([text])[0]
+
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self._embed_batched([text])[0]
+            self.cache.put(text, vector)
+        return vector
+
+    def _collect(self):
+        """Block for the first job, then gather more until max_batch texts or max_wait elapses"""
+        jobs = [self._queue.get()]
+        pending = len(jobs[0].texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while pending < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            pending += len(job.texts)
+
+        return jobs
+
+    def _run(self):
+        """Worker loop: one encode call per collected batch, results scattered back per job"""
+        while True:
+            jobs = self._collect()
+            texts = [text for job in jobs for text in job.texts]
+
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                self.logger.error("[EMBED] Batched embedding of %d texts failed: %s", len(texts), e)
+                for job in jobs:
+                    job.error = e
+                    job.event.set()
+                continue
+
+            if len(jobs) > 1:
+                self.logger.debug("[EMBED] Coalesced %d requests into one batch of %d texts", len(jobs), len(texts))
+
+            offset = 0
+            for job in jobs:
+                job.vectors = vectors[offset:offset + len(job.texts)]
+                offset += len(job.texts)
+                job.event.set()
@@ -0,0 +1,121 @@
+# app/models/embedding_cache.py
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from logger_config import get_logger
+
+class ChunkEmbeddingCache:
+    """
+    Persistent content-hash -> embedding store, so repeated chunks and queries skip the embedding model
+
+    Keys are a BLAKE2b digest of the embedding model id and the stripped text; values are
+    float32 vector bytes in a small SQLite table kept beside the vector DB. A bounded in-process
+    LRU in front of it serves hot entries (repeated queries) without touching SQLite.
+    """
+
+    def __init__(self, path, model_id, max_entries=200000, memory_entries=2048):
+        self.logger = get_logger("embedding_cache")
+        self.path = path
+        self.model_id = model_id.encode("utf-8") + b"\0"
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> vector (list of floats), most recently used last
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Serve reads straight from the memory-mapped file instead of copying through read()
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text):
+        """Digest of model id + text; the model id keeps vectors from different models apart"""
+        return hashlib.blake2b(self.model_id + text.strip().encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, key, vector):
+        """Insert into the in-process LRU, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text):
+        """Return the cached vector for one text, or None"""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts):
+        """Return cached vectors in input order, with None for each miss"""
+        keys = [self._key(text) for text in texts]
+
+        with self._lock:
+            vectors = []
+            disk_keys = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                else:
+                    disk_keys.append(key)
+                vectors.append(vector)
+
+            found = {}
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(disk_keys), 500):
+                batch = disk_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                    self._remember(key, found[key])
+
+            vectors = [vector if vector is not None else found.get(key) for key, vector in zip(keys, vectors)]
+            hit_count = sum(vector is not None for vector in vectors)
+            self.hits += hit_count
+            self.misses += len(keys) - hit_count
+
+        return vectors
+
+    def put(self, text, vector):
+        """Store one freshly computed vector"""
+        self.put_many([text], [vector])
+
+    def put_many(self, texts, vectors):
+        """Store freshly computed vectors for texts, pruning the oldest rows past max_entries"""
+        keys = [self._key(text) for text in texts]
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in zip(keys, vectors)]
+
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, list(vector))
+
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)", rows)
+            # REPLACE re-inserts with a new rowid, so rowid order is least recently written first: keep
+            # the newest max_entries rowids. MAX(rowid) is a B-tree seek, not a COUNT(*) scan per write,
+            # and it sees other workers' inserts too
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            memory_size = len(self._memory)
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "memory_entries": memory_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,170 @@
+# app/models/onnx_embeddings.py
+import fcntl
+import math
+import os
+import platform
+import tempfile
+import numpy as np
+from logger_config import get_logger, log_info, log_success, log_warning
+
+# Let the Rust tokenizer encode a batch across threads (outside the GIL); must be set before first use.
+# Workers import this after gunicorn forks, so the fork-safety reason for disabling it doesn't apply.
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Numba (already pulled in by librosa) fuses pooling and normalization into one pass; NumPy otherwise
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pool_normalize(hidden, mask, out):
+        """Masked mean pooling then L2 normalization, one sequence pass per row into out"""
+        batch, seq, dim = hidden.shape
+        for b in prange(batch):
+            for d in range(dim):
+                out[b, d] = 0.0
+            count = 0.0
+            for t in range(seq):
+                if mask[b, t]:
+                    count += 1.0
+                    for d in range(dim):
+                        out[b, d] += hidden[b, t, d]
+            count = max(count, 1e-9)
+            norm = 0.0
+            for d in range(dim):
+                value = out[b, d] / count
+                out[b, d] = value
+                norm += value * value
+            norm = max(math.sqrt(norm), 1e-12)
+            for d in range(dim):
+                out[b, d] /= norm
+
+def _cpu_flags():
+    """CPU feature flags from /proc/cpuinfo (empty where unavailable)"""
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith(("flags", "Features")):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+def _quantization_config(AutoQuantizationConfig):
+    """
+    Dynamic INT8 config matching the CPU the model is quantized on
+
+    VNNI (AVX-512 or AVX-VNNI) has int8 dot products that can't overflow, so full-range weights
+    are safe there; plain AVX2/AVX-512 multiply through 16-bit intermediates (vpmaddubsw) and need
+    reduce_range (7-bit weights) to avoid saturating. ARM gets its own NEON/dotprod config.
+
+    Returns:
+        tuple: (name, QuantizationConfig)
+    """
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64", AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    flags = _cpu_flags()
+    if flags & {"avx512_vnni", "avx_vnni"}:
+        return "avx512_vnni", AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    if "avx512f" in flags:
+        return "avx512", AutoQuantizationConfig.avx512(is_static=False, per_channel=False, reduce_range=True)
+    return "avx2", AutoQuantizationConfig.avx2(is_static=False, per_channel=False, reduce_range=True)
+
+class ONNXMiniLMEmbeddings:
+    """
+    Sentence embeddings from an INT8-quantized ONNX Runtime export of a sentence-transformers model
+
+    Same embed_documents/embed_query interface as the LangChain HuggingFace embeddings, with the
+    mean pooling and L2 normalization sentence-transformers applies fused into one Numba kernel
+    (_pool_normalize), or done in NumPy when Numba isn't installed.
+    """
+
+    def __init__(self, model_name, cache_dir, batch_size=64, max_length=256):
+        self.logger = get_logger("onnx_embeddings")
+        self.model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.model_name = f"{model_name} (ONNX int8)"
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer, self.model = self._load(cache_dir)
+
+    def _load(self, cache_dir):
+        """Load the quantized model, exporting and quantizing it on first use"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        quantized_file = "model_quantized.onnx"
+        quantized_path = os.path.join(cache_dir, quantized_file)
+        if not os.path.exists(quantized_path):
+            os.makedirs(cache_dir, exist_ok=True)
+            # Every worker starts at once: one exports, the others wait here and then load its result
+            with open(os.path.join(cache_dir, ".export.lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if not os.path.exists(quantized_path):
+                    self._export(cache_dir, quantized_file)
+
+        tokenizer = AutoTokenizer.from_pretrained(cache_dir, use_fast=True)
+        if not tokenizer.is_fast:
+            log_warning(self.logger, "Fast (Rust) tokenizer unavailable; tokenization will run in Python")
+        model = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name=quantized_file)
+        return tokenizer, model
+
+    def _export(self, cache_dir, quantized_file):
+        """
+        Export, quantize and save the model into cache_dir. Caller holds the export lock.
+
+        Everything is built in a scratch directory and moved in with os.replace, the quantized
+        model last, so an interrupted export never leaves a half-written file under its real name.
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        log_info(self.logger, f"Exporting {self.model_id} to ONNX and quantizing to INT8 (one-time)")
+        with tempfile.TemporaryDirectory(dir=cache_dir, prefix=".export-") as scratch:
+            model = ORTModelForFeatureExtraction.from_pretrained(self.model_id, export=True)
+            model.save_pretrained(scratch)
+            AutoTokenizer.from_pretrained(self.model_id, use_fast=True).save_pretrained(scratch)
+
+            # Dynamic (calibration-free) INT8, tuned for this CPU's int8 instructions
+            target, quantization_config = _quantization_config(AutoQuantizationConfig)
+            quantizer = ORTQuantizer.from_pretrained(scratch)
+            quantizer.quantize(save_dir=scratch, quantization_config=quantization_config)
+
+            names = sorted(os.listdir(scratch), key=lambda name: name == quantized_file)
+            for name in names:
+                os.replace(os.path.join(scratch, name), os.path.join(cache_dir, name))
+        log_success(self.logger, f"Quantized ONNX model ({target}) saved to {cache_dir}")
+
+    def _encode(self, texts):
+        """Embed one batch: tokenize, run the ONNX session, mean-pool and L2-normalize"""
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        hidden = self.model(**inputs).last_hidden_state
+        if njit is not None:
+            pooled = np.empty((hidden.shape[0], hidden.shape[2]), dtype=np.float32)
+            _pool_normalize(np.ascontiguousarray(hidden, dtype=np.float32), inputs["attention_mask"], pooled)
+            return pooled
+
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts):
+        """Embed texts in length-sorted batches, so each batch pads to similar lengths"""
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
@@ -0,0 +1,65 @@
+# app/models/st_embeddings.py
+import threading
+from logger_config import get_logger, log_info
+
+# Loaded SentenceTransformer models shared process-wide, keyed by (model name, device, quantized)
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+def load_sentence_transformer(model_name, device="cpu", quantize=False):
+    """
+    Load a SentenceTransformer once per process and return the shared instance
+
+    Args:
+        model_name (str): sentence-transformers model name (e.g. 'all-MiniLM-L6-v2')
+        device (str): Torch device to load the weights on
+        quantize (bool): Dynamically quantize the transformer's Linear layers to INT8 (CPU only)
+
+    Returns:
+        SentenceTransformer: The cached model
+    """
+    key = (model_name, device, quantize)
+    with _MODEL_CACHE_LOCK:
+        if key not in _MODEL_CACHE:
+            from sentence_transformers import SentenceTransformer
+            logger = get_logger("st_embeddings")
+            log_info(logger, f"Loading SentenceTransformer {model_name} on {device}")
+            model = SentenceTransformer(model_name, device=device)
+
+            if quantize:
+                import torch
+                # INT8 weights for every nn.Linear, run through fbgemm/oneDNN int8 GEMMs (VNNI where available)
+                transformer = model[0]
+                transformer.auto_model = torch.ao.quantization.quantize_dynamic(
+                    transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                log_info(logger, f"Quantized {model_name} Linear layers to INT8")
+
+            _MODEL_CACHE[key] = model
+        return _MODEL_CACHE[key]
+
+class SentenceTransformerEmbeddings:
+    """
+    Thin LangChain-compatible embeddings adapter over a shared SentenceTransformer
+
+    Same embed_documents/embed_query interface and normalized output as LangChain's
+    HuggingFaceEmbeddings, without each wrapper loading its own copy of the weights.
+    """
+
+    def __init__(self, model_name, device="cpu", batch_size=64, quantize=False):
+        # Quantized vectors differ slightly, so they get their own embedding-cache namespace
+        self.model_name = f"{model_name} (int8)" if quantize else model_name
+        self.batch_size = batch_size
+        self.model = load_sentence_transformer(model_name, device, quantize)
+
+    def embed_documents(self, texts):
+        """Embed texts as L2-normalized vectors"""
+        if not texts:
+            return []
+        return self.model.encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        ).tolist()
+
+    def embed_query(self, text):
+        """Embed a single query"""
+        return self.embed_documents([text])[0]
@@ -1,20 +1,104 @@
 # app/models/vector_store.py
 import chromadb
 from langchain_community.vectorstores import Chroma
+from langchain.schema import Document
 import time
 import os
+import threading
+import hashlib
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from models.embedding_batcher import EmbeddingBatcher
+from models.embedding_cache import ChunkEmbeddingCache
+from models.onnx_embeddings import ONNXMiniLMEmbeddings
+from models.st_embeddings import SentenceTransformerEmbeddings
 from logger_config import get_logger, log_success, log_error, log_warning, log_info
 
 class VectorStore:
     """Enhanced Vector Store with logging and error handling - Keras 3 Compatible"""
     
-    def __init__(self, path):
+    # IDs fetched and deleted per round trip by clear_collection(), under Chroma's max batch size
+    CLEAR_BATCH_SIZE = 5000
+    
+    def __init__(self, path, preload=True):
+        """
+        Args:
+            path (str): Persist directory of the Chroma collection
+            preload (bool): Load the embedding model and collection on a background thread right away;
+                otherwise they load on first use
+        """
         self.logger = get_logger("vector_store")
         self.path = path
         self.embeddings = None
+        self.embedding_batcher = None
         self.vector_store = None
-        self._initialize_store()
+        self._health_vector = None
+        self._client = None
+        self._collection = None
+        # Locally maintained document count, valid for the generation it was read at; see _document_count()
+        self._cached_count = None
+        self._count_generation = None
+        # Generation the collection handle was last resolved at; see _sync_collection()
+        self._collection_generation = None
+        # Touched on every write so other workers can tell the collection changed; see get_generation()
+        self._generation_path = os.path.join(path, "collection.generation")
+        # Serializes writes to the shared Chroma collection across concurrent requests in a worker
+        self._write_lock = threading.RLock()
+        self._init_lock = threading.Lock()
+        self._ready = threading.Event()
+        if preload:
+            threading.Thread(target=self._preload, name="vector_store_preload", daemon=True).start()
+    
+    def _preload(self):
+        """Background warm start; a failure here is logged and retried on first real use"""
+        try:
+            self._ensure_initialized()
+        except Exception:
+            pass
+    
+    def _ensure_initialized(self):
+        """Load the embedding model and the collection exactly once, blocking until they are ready"""
+        if self._ready.is_set():
+            self._sync_collection()
+            return
+        with self._init_lock:
+            if not self._ready.is_set():
+                self._initialize_store()
+                self._collection_generation = self.get_generation()
+                self._ready.set()
+    
+    def _sync_collection(self):
+        """
+        Re-resolve the collection handle after another worker dropped and recreated it
+        
+        delete_collection() gives the collection a new id, which leaves every other worker's
+        handle pointing at the deleted one. Checked once per generation change (one stat() per call).
+        """
+        generation = self.get_generation()
+        if generation == self._collection_generation:
+            return
+        with self._write_lock:
+            collection = self._client.get_or_create_collection(
+                "document_collection", metadata=dict(Config.VECTOR_DB_HNSW_METADATA)
+            )
+            if collection.id != self._collection.id:
+                self.logger.debug("Collection was recreated by another worker, switching to the new handle")
+                self._collection = collection
+                self.vector_store._collection = collection
+                self._cached_count = None
+            self._collection_generation = generation
+    
+    def wait_until_ready(self):
+        """
+        Block until the store is loaded, raising the initialization error if loading fails
+        
+        Returns:
+            VectorStore: self, for chaining
+        """
+        self._ensure_initialized()
+        return self
     
     def _initialize_store(self):
         """Initialize the vector store with proper error handling"""
@@ -28,22 +112,44 @@ class VectorStore:
             # Try multiple embedding approaches to handle Keras compatibility issues
             self.embeddings = self._initialize_embeddings()
             
-            # Initialize vector store
+            # Document embedding goes through a shared micro-batcher so concurrent uploads share encode calls
+            # and chunks seen before (re-uploads, shared paragraphs) skip the model entirely
+            self.embedding_batcher = EmbeddingBatcher(
+                self.embeddings,
+                max_batch=Config.EMBEDDING_BATCH_SIZE,
+                max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS,
+                cache=ChunkEmbeddingCache(
+                    os.path.join(self.path, Config.EMBEDDING_CACHE_FILE),
+                    getattr(self.embeddings, 'model_name', self.embeddings.__class__.__name__),
+                    max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+                    memory_entries=Config.EMBEDDING_CACHE_MEMORY_ENTRIES
+                )
+            )
+            
+            # Native client: embedded on-disk by default, or a shared Chroma server when CHROMA_HOST is set
+            if Config.CHROMA_HOST:
+                self._client = chromadb.HttpClient(host=Config.CHROMA_HOST, port=Config.CHROMA_PORT)
+            else:
+                self._client = chromadb.PersistentClient(path=self.path)
+            
+            # The LangChain wrapper is kept for the LLM service's retriever; add and search use the native collection
             self.vector_store = Chroma(
-                persist_directory=self.path,
-                embedding_function=self.embeddings,
-                collection_name="document_collection"
+                client=self._client,
+                embedding_function=self.embedding_batcher,
+                collection_name="document_collection",
+                collection_metadata=dict(Config.VECTOR_DB_HNSW_METADATA)
             )
+            self._collection = self.vector_store._collection
             
             init_time = time.time() - start_time
             log_success(self.logger, f"Vector store initialized successfully in {init_time:.2f}s")
             
-            # Log collection info
-            try:
-                collection_count = self.vector_store._collection.count()
-                log_info(self.logger, f"Current collection size: {collection_count} documents")
-            except Exception as count_error:
-                log_warning(self.logger, f"Could not get collection count: {count_error}")
+            # Log collection info (count() is a SQLite aggregate, so only when debugging)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                try:
+                    self.logger.debug(f"Current collection size: {self._document_count()} documents")
+                except Exception as count_error:
+                    log_warning(self.logger, f"Could not get collection count: {count_error}")
             
         except Exception as e:
             log_error(self.logger, f"Failed to initialize vector store: {str(e)}")
@@ -52,9 +158,31 @@ class VectorStore:
     def _initialize_embeddings(self):
         """Initialize embeddings with fallback options for Keras compatibility"""
         
-        # Option 1: Try HuggingFace embeddings with tf-keras fix
+        # Option 1: INT8-quantized ONNX Runtime model (no PyTorch/Keras on the inference path)
+        if Config.EMBEDDING_ONNX:
+            try:
+                log_info(self.logger, "Attempting ONNX Runtime INT8 embeddings (Option 1)")
+                
+                embeddings = ONNXMiniLMEmbeddings(
+                    Config.EMBEDDING_MODEL,
+                    cache_dir=Config.ONNX_EMBEDDING_DIR,
+                    batch_size=Config.EMBEDDING_BATCH_SIZE
+                )
+                
+                # Test the embeddings
+                test_result = embeddings.embed_query("test embedding")
+                if test_result and len(test_result) > 0:
+                    log_success(self.logger, "ONNX Runtime INT8 embeddings initialized successfully")
+                    return embeddings
+                else:
+                    raise Exception("Embedding test failed")
+                    
+            except Exception as e0:
+                log_warning(self.logger, f"ONNX Runtime embeddings failed: {str(e0)}")
+        
+        # Option 2: Shared SentenceTransformer (tf-keras fix applied first)
         try:
-            log_info(self.logger, "Attempting HuggingFace embeddings (Option 1)")
+            log_info(self.logger, "Attempting SentenceTransformer embeddings (Option 2)")
             
             # Try to import and fix tf-keras issue
             try:
@@ -66,18 +194,12 @@ class VectorStore:
             except:
                 pass  # Continue without GPU optimization
             
-            from langchain_community.embeddings import HuggingFaceEmbeddings
-            
-            embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={
-                    'device': 'cpu',  # Force CPU to avoid GPU/CUDA issues
-                    'trust_remote_code': False
-                },
-                encode_kwargs={
-                    'normalize_embeddings': True,
-                    'batch_size': 1  # Smaller batch size for stability
-                }
+            # The model is loaded once per process and shared, so a failed attempt never holds a second copy
+            embeddings = SentenceTransformerEmbeddings(
+                Config.EMBEDDING_MODEL,
+                device='cpu',  # Force CPU to avoid GPU/CUDA issues
+                batch_size=Config.EMBEDDING_BATCH_SIZE,  # Matches the coalesced batches from EmbeddingBatcher
+                quantize=Config.QUANTIZE_EMBEDDINGS
             )
             
             # Test the embeddings
@@ -85,71 +207,42 @@ class VectorStore:
             test_result = embeddings.embed_query(test_text)
             
             if test_result and len(test_result) > 0:
-                log_success(self.logger, "HuggingFace embeddings initialized successfully")
+                log_success(self.logger, "SentenceTransformer embeddings initialized successfully")
                 return embeddings
             else:
                 raise Exception("Embedding test failed")
                 
         except Exception as e1:
-            log_warning(self.logger, f"HuggingFace embeddings failed: {str(e1)}")
+            log_warning(self.logger, f"SentenceTransformer embeddings failed: {str(e1)}")
             
-            # Option 2: Try alternative embeddings from langchain-huggingface
+            # Option 3: Use OpenAI embeddings if available
             try:
-                log_info(self.logger, "Attempting langchain-huggingface embeddings (Option 2)")
+                log_info(self.logger, "Attempting OpenAI embeddings (Option 3)")
                 
-                # Try importing from the new package
-                try:
-                    from langchain_huggingface import HuggingFaceEmbeddings as HFEmbeddings
+                if hasattr(Config, 'OPENAI_API_KEY') and Config.OPENAI_API_KEY:
+                    from langchain_community.embeddings import OpenAIEmbeddings
                     
-                    embeddings = HFEmbeddings(
-                        model_name="all-MiniLM-L6-v2",
-                        model_kwargs={'device': 'cpu'},
-                        encode_kwargs={'normalize_embeddings': True}
+                    embeddings = OpenAIEmbeddings(
+                        openai_api_key=Config.OPENAI_API_KEY,
+                        model="text-embedding-ada-002"
                     )
                     
                     # Test the embeddings
                     test_result = embeddings.embed_query("test embedding")
                     if test_result and len(test_result) > 0:
-                        log_success(self.logger, "langchain-huggingface embeddings initialized successfully")
+                        log_success(self.logger, "OpenAI embeddings initialized successfully")
                         return embeddings
                     else:
-                        raise Exception("Embedding test failed")
-                        
-                except ImportError:
-                    log_warning(self.logger, "langchain-huggingface package not installed")
-                    raise Exception("langchain-huggingface not available")
+                        raise Exception("OpenAI embedding test failed")
+                else:
+                    raise Exception("OpenAI API key not available")
                     
-            except Exception as e2:
-                log_warning(self.logger, f"Alternative embeddings failed: {str(e2)}")
+            except Exception as e3:
+                log_warning(self.logger, f"OpenAI embeddings failed: {str(e3)}")
                 
-                # Option 3: Use OpenAI embeddings if available
-                try:
-                    log_info(self.logger, "Attempting OpenAI embeddings (Option 3)")
-                    
-                    if hasattr(Config, 'OPENAI_API_KEY') and Config.OPENAI_API_KEY:
-                        from langchain_community.embeddings import OpenAIEmbeddings
-                        
-                        embeddings = OpenAIEmbeddings(
-                            openai_api_key=Config.OPENAI_API_KEY,
-                            model="text-embedding-ada-002"
-                        )
-                        
-                        # Test the embeddings
-                        test_result = embeddings.embed_query("test embedding")
-                        if test_result and len(test_result) > 0:
-                            log_success(self.logger, "OpenAI embeddings initialized successfully")
-                            return embeddings
-                        else:
-                            raise Exception("OpenAI embedding test failed")
-                    else:
-                        raise Exception("OpenAI API key not available")
-                        
-                except Exception as e3:
-                    log_warning(self.logger, f"OpenAI embeddings failed: {str(e3)}")
-                    
-                    # Option 4: Use a simple embedding fallback
-                    log_warning(self.logger, "Using fallback embedding method")
-                    return self._create_fallback_embeddings()
+                # Option 4: Use a simple embedding fallback
+                log_warning(self.logger, "Using fallback embedding method")
+                return self._create_fallback_embeddings()
     
     def _create_fallback_embeddings(self):
         """Create a simple fallback embedding function"""
@@ -159,18 +252,13 @@ class VectorStore:
             def embed_documents(self, texts):
                 # Simple hash-based embeddings as last resort
                 import hashlib
-                embeddings = []
-                for text in texts:
-                    # Create a simple hash-based embedding
-                    hash_obj = hashlib.md5(text.encode())
-                    hex_dig = hash_obj.hexdigest()
-                    # Convert to numerical embedding (384 dimensions to match all-MiniLM-L6-v2)
-                    embedding = [int(hex_dig[i:i+2], 16) / 255.0 for i in range(0, min(len(hex_dig), 32), 2)]
-                    # Pad to 384 dimensions
-                    while len(embedding) < 384:
-                        embedding.extend(embedding[:min(len(embedding), 384 - len(embedding))])
-                    embeddings.append(embedding[:384])
-                return embeddings
+                if not texts:
+                    return []
+                # One 16-byte MD5 digest per text, scaled to [0, 1] and tiled to 384 dimensions
+                # (all-MiniLM-L6-v2 size) in a single array op
+                digests = b"".join(hashlib.md5(text.encode()).digest() for text in texts)
+                values = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 16).astype(np.float32) / 255.0
+                return np.tile(values, (1, 384 // 16)).tolist()
             
             def embed_query(self, text):
                 return self.embed_documents([text])[0]
@@ -181,6 +269,7 @@ class VectorStore:
     def add_documents(self, documents):
         """Add documents to the vector store with logging"""
         try:
+            self._ensure_initialized()
             if not documents:
                 log_warning(self.logger, "No documents provided to add")
                 return False
@@ -189,35 +278,224 @@ class VectorStore:
             start_time = time.time()
             
             # Add documents to vector store
-            self.vector_store.add_documents(documents)
+            texts = [doc.page_content for doc in documents]
+            metadatas = [doc.metadata for doc in documents]
+            self._add_in_batches(
+                texts,
+                lambda start, stop: self._add_native(texts[start:stop], metadatas[start:stop])
+            )
             
-            # Persist the changes (for older versions of Chroma)
-            try:
-                self.vector_store.persist()
-                log_info(self.logger, "Changes persisted to disk")
-            except AttributeError:
-                # Newer versions of Chroma auto-persist
-                log_info(self.logger, "Auto-persistence enabled")
+            with self._write_lock:
+                # Persist the changes (for older versions of Chroma)
+                try:
+                    self.vector_store.persist()
+                    log_info(self.logger, "Changes persisted to disk")
+                except AttributeError:
+                    # Newer versions of Chroma auto-persist
+                    log_info(self.logger, "Auto-persistence enabled")
             
             add_time = time.time() - start_time
             log_success(self.logger, f"Successfully added {len(documents)} documents in {add_time:.2f}s")
             
-            # Log updated collection size
-            try:
-                collection_count = self.vector_store._collection.count()
-                log_info(self.logger, f"Updated collection size: {collection_count} documents")
-            except Exception as count_error:
-                log_warning(self.logger, f"Could not get updated collection count: {count_error}")
-            
             return True
             
         except Exception as e:
             log_error(self.logger, f"Failed to add documents to vector store: {str(e)}")
             return False
     
+    def _add_native(self, texts, metadatas=None):
+        """
+        Embed texts through the batcher and add them straight to the Chroma collection
+        
+        IDs are content hashes, so texts already in the collection (re-uploaded documents) are
+        skipped before embedding instead of being stored as duplicate vectors.
+        
+        Args:
+            texts (list): Texts to add
+            metadatas (list, optional): One metadata dict per text
+        
+        Returns:
+            int: Number of texts actually added
+        """
+        new = self._unstored(texts)
+        if len(new) < len(texts):
+            self.logger.debug(f"[DEDUP] Skipping {len(texts) - len(new)} of {len(texts)} texts already stored")
+        if not new:
+            return 0
+        
+        ids = [doc_id for doc_id, _ in new]
+        metadatas = [metadatas[i] for _, i in new] if metadatas else None
+        texts = [texts[i] for _, i in new]
+        embeddings = self.embedding_batcher.embed_documents(texts)
+        
+        # Chroma rejects empty metadata dicts, so texts without metadata are added in a separate call.
+        # upsert keeps a concurrent insert of the same content (another worker) from failing on a duplicate ID
+        with_metadata = [i for i, metadata in enumerate(metadatas or ()) if metadata]
+        if with_metadata:
+            self._collection.upsert(
+                ids=[ids[i] for i in with_metadata],
+                embeddings=[embeddings[i] for i in with_metadata],
+                documents=[texts[i] for i in with_metadata],
+                metadatas=[metadatas[i] for i in with_metadata]
+            )
+        if len(with_metadata) < len(texts):
+            has_metadata = set(with_metadata)
+            without_metadata = [i for i in range(len(texts)) if i not in has_metadata]
+            self._collection.upsert(
+                ids=[ids[i] for i in without_metadata],
+                embeddings=[embeddings[i] for i in without_metadata],
+                documents=[texts[i] for i in without_metadata]
+            )
+        if self._cached_count is not None:
+            self._cached_count += len(texts)
+        self._bump_generation()
+        return len(texts)
+    
+    def _unstored(self, texts):
+        """
+        Content-hash IDs of the texts not yet in the collection
+        
+        Returns:
+            list: (id, index) of the first occurrence of each distinct text that isn't stored
+        """
+        unique = {}
+        for i, text in enumerate(texts):
+            unique.setdefault(hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(), i)
+        
+        existing = set(self._collection.get(ids=list(unique), include=[])["ids"])
+        return [(doc_id, i) for doc_id, i in unique.items() if doc_id not in existing]
+    
+    def _bump_generation(self):
+        """Record that the collection changed, visible to every worker sharing the store path"""
+        with open(self._generation_path, "w") as generation_file:
+            generation_file.write(str(time.time_ns()))
+    
+    def get_generation(self):
+        """
+        Cheap change marker for the collection, for caches derived from its contents
+        
+        Returns:
+            int: A value that changes whenever any process writes to the collection (0 before the first write)
+        """
+        try:
+            return os.stat(self._generation_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+    
+    def _document_count(self):
+        """
+        Collection size without a SQLite aggregate per call
+        
+        The count is re-read only when the collection generation moved (a write by this or any
+        other worker) and one stat() per call otherwise. Zero (or unknown) is always re-read, so
+        documents another worker added are never reported as an empty store.
+        """
+        generation = self.get_generation()
+        if not self._cached_count or generation != self._count_generation:
+            self._cached_count = self._collection.count()
+            self._count_generation = generation
+        return self._cached_count
+    
+    def _query_native(self, vectors, k):
+        """
+        Run one collection query for several embeddings
+        
+        Returns:
+            list: One list of (Document, distance) pairs per vector
+        """
+        response = self._collection.query(
+            query_embeddings=vectors,
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [(Document(page_content=text, metadata=metadata or {}), distance)
+             for text, metadata, distance in zip(texts, metadatas, distances)]
+            for texts, metadatas, distances in zip(response["documents"], response["metadatas"], response["distances"])
+        ]
+    
+    def _add_in_batches(self, texts, add_batch):
+        """
+        Insert in Config.CHROMA_BATCH_SIZE slices to bound peak memory and write-lock hold time
+        
+        While slice N is inserted, the texts of slice N+1 that aren't stored yet are embedded on a
+        helper thread into the embedding cache, so the insert's own embedding call is a cache hit.
+        
+        Args:
+            texts (list): Text of every item, used to prefetch embeddings
+            add_batch (callable): add_batch(start, stop) inserts items [start, stop)
+        """
+        batch_size = Config.CHROMA_BATCH_SIZE
+        prefetching = self.embedding_batcher is not None and self.embedding_batcher.cache is not None
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed_prefetch") as executor:
+            prefetch = None
+            for start in range(0, len(texts), batch_size):
+                stop = start + batch_size
+                
+                # This slice's embeddings must be cached before Chroma asks for them
+                if prefetch is not None:
+                    prefetch.result()
+                prefetch = None
+                if prefetching and stop < len(texts):
+                    prefetch = executor.submit(self._prefetch_embeddings, texts[stop:stop + batch_size])
+                
+                with self._write_lock:
+                    add_batch(start, stop)
+                self.logger.debug(f"[BATCH] Inserted items {start}-{min(stop, len(texts))} of {len(texts)}")
+    
+    def _prefetch_embeddings(self, texts):
+        """Embed, into the embedding cache, the texts _add_native() will actually insert"""
+        # Same ID check as the insert, so re-ingested chunks cost no embedding work here either
+        new = [texts[i] for _, i in self._unstored(texts)]
+        if new:
+            self.embedding_batcher.embed_documents(new)
+    
+    def _prefetch_segments(self):
+        """Ask the kernel to read the persisted segment files into the page cache ahead of use"""
+        if not hasattr(os, 'posix_fadvise'):
+            return 0
+        
+        prefetched = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    fd = os.open(os.path.join(root, name), os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    # Asynchronous readahead; returns immediately and the reads overlap startup
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    prefetched += os.fstat(fd).st_size
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+        return prefetched
+    
+    def warmup(self):
+        """Run one dummy query so the HNSW index is loaded into memory before the first real request"""
+        try:
+            self._ensure_initialized()
+            start_time = time.time()
+            if Config.VECTOR_DB_PREFETCH:
+                prefetched = self._prefetch_segments()
+                self.logger.debug(f"[PREFETCH] Requested readahead of {prefetched} bytes of vector store segments")
+            
+            collection = self._collection
+            if self._document_count() == 0:
+                log_info(self.logger, "Vector store warmup skipped (empty collection)")
+                return
+            
+            collection.query(query_embeddings=[self.embeddings.embed_query("warmup")], n_results=1)
+            log_info(self.logger, f"Vector store warmed up in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            log_warning(self.logger, f"Vector store warmup failed: {str(e)}")
+    
     def similarity_search(self, query, k=4):
         """Perform similarity search with logging"""
         try:
+            self._ensure_initialized()
             if not query or not query.strip():
                 log_warning(self.logger, "Empty query provided")
                 return []
@@ -226,7 +504,8 @@ class VectorStore:
             start_time = time.time()
             
             # Perform search
-            results = self.vector_store.similarity_search(query, k=k)
+            vector = self.embedding_batcher.embed_query(query)
+            results = [doc for doc, _ in self._query_native([vector], k)[0]]
             
             search_time = time.time() - start_time
             log_success(self.logger, f"Found {len(results)} results in {search_time:.2f}s")
@@ -245,9 +524,45 @@ class VectorStore:
             log_error(self.logger, f"Similarity search failed: {str(e)}")
             return []
     
+    def similarity_search_batch(self, queries, k=4, with_scores=False):
+        """
+        Search several queries with one batched embedding pass and one collection query
+        
+        Args:
+            queries (list): Query strings
+            k (int): Results per query
+            with_scores (bool): Return (Document, distance) pairs instead of Documents
+        
+        Returns:
+            list: One result list per query, in input order
+        """
+        try:
+            self._ensure_initialized()
+            if not queries:
+                return []
+            
+            log_info(self.logger, f"Performing batched similarity search for {len(queries)} queries")
+            start_time = time.time()
+            
+            # One forward pass for all queries, then one HNSW call instead of N LangChain round trips
+            vectors = self.embedding_batcher.embed_documents(queries)
+            results = self._query_native(vectors, k)
+            if not with_scores:
+                results = [[doc for doc, _ in pairs] for pairs in results]
+            
+            search_time = time.time() - start_time
+            log_success(self.logger, f"Batched search for {len(queries)} queries finished in {search_time:.2f}s")
+            
+            return results
+            
+        except Exception as e:
+            log_error(self.logger, f"Batched similarity search failed: {str(e)}")
+            return [[] for _ in queries]
+    
     def similarity_search_with_score(self, query, k=4):
         """Perform similarity search with scores"""
         try:
+            self._ensure_initialized()
             if not query or not query.strip():
                 log_warning(self.logger, "Empty query provided")
                 return []
@@ -255,8 +570,9 @@ class VectorStore:
             log_info(self.logger, f"Performing similarity search with scores for: '{query[:50]}...'")
             start_time = time.time()
             
-            # Perform search with scores
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            # Perform search with scores (raw distances, as LangChain's Chroma wrapper reports them)
+            vector = self.embedding_batcher.embed_query(query)
+            results = self._query_native([vector], k)[0]
             
             search_time = time.time() - start_time
             log_success(self.logger, f"Found {len(results)} scored results in {search_time:.2f}s")
@@ -274,17 +590,19 @@ class VectorStore:
     def delete_collection(self):
         """Delete the entire collection"""
         try:
+            self._ensure_initialized()
             log_warning(self.logger, "Deleting entire vector store collection")
             
-            # Try different methods depending on Chroma version
-            try:
-                self.vector_store.delete_collection()
-            except AttributeError:
-                # Alternative method for newer versions
-                if hasattr(self.vector_store, '_collection'):
-                    self.vector_store._collection.delete()
-                else:
-                    raise Exception("Unable to delete collection - method not available")
+            # Drop it through the native client, then recreate it empty so the store stays usable.
+            # The new collection has a new id; other workers pick it up in _sync_collection()
+            with self._write_lock:
+                self._client.delete_collection(self._collection.name)
+                self._collection = self._client.get_or_create_collection(
+                    "document_collection", metadata=dict(Config.VECTOR_DB_HNSW_METADATA)
+                )
+                self.vector_store._collection = self._collection
+                self._cached_count = 0
+                self._bump_generation()
             
             log_success(self.logger, "Vector store collection deleted successfully")
             return True
@@ -293,12 +611,27 @@ class VectorStore:
             log_error(self.logger, f"Failed to delete collection: {str(e)}")
             return False
     
+    def get_document_count(self):
+        """
+        Number of stored chunks, for per-query "any documents?" checks
+        
+        Unlike get_collection_info() this skips the embedding cache statistics (a SQLite
+        aggregate over the whole cache), so it is essentially free once the count is known.
+        """
+        try:
+            self._ensure_initialized()
+            return self._document_count()
+        except Exception as count_error:
+            self.logger.debug(f"Could not get count: {count_error}")
+            return 0
+    
     def get_collection_info(self):
         """Get information about the current collection"""
         try:
+            self._ensure_initialized()
             collection_count = 0
             try:
-                collection_count = self.vector_store._collection.count()
+                collection_count = self._document_count()
             except Exception as count_error:
                 self.logger.debug(f"Could not get count: {count_error}")
             
@@ -318,7 +651,8 @@ class VectorStore:
                 "status": "active",
                 "cost": "Free",
                 "device": "CPU",
-                "vector_store_type": "Chroma"
+                "vector_store_type": "Chroma",
+                "embedding_cache": self.embedding_batcher.cache.get_stats() if self.embedding_batcher and self.embedding_batcher.cache else {}
             }
         except Exception as e:
             log_error(self.logger, f"Failed to get collection info: {str(e)}")
@@ -351,16 +685,27 @@ class VectorStore:
                 log_error(self.logger, "Embeddings not initialized") 
                 return False
             
-            # Try a simple embedding operation
-            test_text = "health check test"
-            test_embedding = self.embeddings.embed_query(test_text)
+            # Embed the probe once on the model itself (not the embedding cache); later probes reuse it
+            if self._health_vector is None:
+                test_embedding = self.embeddings.embed_query("health check test")
+                
+                if not test_embedding or len(test_embedding) == 0:
+                    log_error(self.logger, "Embedding generation failed")
+                    return False
+                self._health_vector = test_embedding
+            
+            # Pick up a collection another worker dropped and recreated, so the probe doesn't hit a stale handle
+            if self._ready.is_set():
+                self._sync_collection()
             
-            if not test_embedding or len(test_embedding) == 0:
-                log_error(self.logger, "Embedding generation failed")
-                return False
+            # Query the collection directly with the fixed vector (will work even with empty collection)
+            self._collection.query(query_embeddings=[self._health_vector], n_results=1)
             
-            # Try a simple search operation (will work even with empty collection)
-            test_results = self.similarity_search("test", k=1)
+            # Resync the locally maintained count with SQLite (picks up other workers' writes).
+            # The generation is read first, so a write landing during count() still forces a re-read
+            generation = self.get_generation()
+            self._cached_count = self._collection.count()
+            self._count_generation = generation
             
             log_success(self.logger, "Vector store health check passed")
             return True
@@ -370,23 +715,29 @@ class VectorStore:
             return False
     
     def clear_collection(self):
-        """Clear all documents from the collection without deleting it"""
+        """Clear all documents from the collection, keeping its name and settings"""
         try:
+            self._ensure_initialized()
             log_warning(self.logger, "Clearing all documents from collection")
             
-            # Get all document IDs and delete them
-            if hasattr(self.vector_store, '_collection'):
-                collection = self.vector_store._collection
-                all_ids = collection.get()['ids']
-                
-                if all_ids:
-                    collection.delete(ids=all_ids)
-                    log_success(self.logger, f"Cleared {len(all_ids)} documents from collection")
-                else:
-                    log_info(self.logger, "Collection was already empty")
+            # Delete by ID in fixed-size pages: only IDs are fetched (no documents or embeddings), and
+            # the collection keeps its id, so other workers' handles stay valid
+            cleared = 0
+            with self._write_lock:
+                while True:
+                    ids = self._collection.get(limit=self.CLEAR_BATCH_SIZE, include=[])['ids']
+                    if not ids:
+                        break
+                    self._collection.delete(ids=ids)
+                    cleared += len(ids)
+                if cleared:
+                    self._cached_count = 0
+                    self._bump_generation()
+            
+            if cleared:
+                log_success(self.logger, f"Cleared {cleared} documents from collection")
             else:
-                log_warning(self.logger, "Cannot clear collection - method not available")
-                return False
+                log_info(self.logger, "Collection was already empty")
             
             return True
             
@@ -397,6 +748,7 @@ class VectorStore:
     def add_texts(self, texts, metadatas=None):
         """Add raw texts to the vector store"""
         try:
+            self._ensure_initialized()
             if not texts:
                 log_warning(self.logger, "No texts provided")
                 return False
@@ -405,7 +757,11 @@ class VectorStore:
             start_time = time.time()
             
             # Add texts to vector store
-            self.vector_store.add_texts(texts, metadatas=metadatas)
+            texts = list(texts)
+            self._add_in_batches(
+                texts,
+                lambda start, stop: self._add_native(texts[start:stop], metadatas[start:stop] if metadatas else None)
+            )
             
             add_time = time.time() - start_time
             log_success(self.logger, f"Successfully added {len(texts)} texts in {add_time:.2f}s")
@@ -1,23 +1,70 @@
 # app/services/audio_service.py
-import whisper
-import torch
 import numpy as np
-import librosa
-import soundfile as sf
+import io
+import shutil
 import tempfile
 import os
 from datetime import datetime
 import time
+import threading
+
+# faster-whisper (CTranslate2) runs the same Whisper weights quantized; fall back to OpenAI Whisper
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+# soxr resamples in C; librosa is the slower fallback
+try:
+    import soxr
+except ImportError:
+    soxr = None
 from config import Config
 from logger_config import get_logger, AudioLogger
 
+# Loaded models shared by every WhisperSTTService in the process, keyed by (backend, model, device, compute type)
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+WHISPER_SAMPLE_RATE = 16000
+
+def _to_whisper_input(audio, sample_rate, scratch=None):
+    """
+    Convert an audio array to the 16kHz float32 mono layout both Whisper backends accept
+    
+    Args:
+        audio (np.array): Mono or (frames, channels) audio of any numeric dtype
+        sample_rate (int): Sample rate of the audio
+        scratch (callable, optional): scratch(frames) returns a reusable float32 buffer for the mono downmix
+    
+    Returns:
+        np.array: 16kHz float32 mono audio
+    """
+    if audio.ndim > 1:
+        # Convert stereo to mono, averaging straight into float32 without an intermediate float64 array
+        out = scratch(audio.shape[0]) if scratch is not None else None
+        audio = np.mean(audio, axis=1, dtype=np.float32, out=out)
+    audio = audio.astype(np.float32, copy=False)
+    
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        if soxr is not None:
+            audio = soxr.resample(audio, sample_rate, WHISPER_SAMPLE_RATE)
+        else:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=WHISPER_SAMPLE_RATE)
+    return audio
+
 class WhisperSTTService:
-    """Speech-to-Text service using OpenAI Whisper"""
+    """Speech-to-Text service using faster-whisper, or OpenAI Whisper when it isn't installed"""
     
     def __init__(self):
         self.logger = get_logger("whisper_stt")
         self.audio_logger = AudioLogger("whisper_stt")
         self.model = None
+        self.device = None
+        self.backend = None
+        self.compute_type = None
+        # Per-thread downmix buffers for real-time chunks; requests transcribe concurrently
+        self._scratch = threading.local()
         self._load_model()
     
     def _load_model(self):
@@ -27,11 +74,27 @@ class WhisperSTTService:
             start_time = time.time()
             
             # Check if CUDA is available
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.logger.info(f"🔧 Using device: {device}")
+            self.device = "cuda" if self._cuda_available() else "cpu"
+            self.logger.info(f"🔧 Using device: {self.device}")
+            
+            if WhisperModel is not None:
+                self.backend = "faster-whisper"
+                self.compute_type = (Config.WHISPER_GPU_COMPUTE_TYPE if self.device == "cuda"
+                                     else Config.WHISPER_CPU_COMPUTE_TYPE)
+            else:
+                self.backend = "openai-whisper"
+                self.compute_type = "float16" if self.device == "cuda" else "float32"
             
-            # Load the model
-            self.model = whisper.load_model(Config.WHISPER_MODEL, device=device)
+            # Load the model, or reuse the one another instance already loaded
+            key = (self.backend, Config.WHISPER_MODEL, self.device, self.compute_type)
+            with _MODEL_CACHE_LOCK:
+                if key not in _MODEL_CACHE:
+                    _MODEL_CACHE[key] = self._create_model()
+                else:
+                    self.logger.info("♻️ Reusing already loaded Whisper model")
+                self.model = _MODEL_CACHE[key]
+            
+            self.logger.info(f"🔧 Whisper backend: {self.backend} ({self.compute_type})")
             
             load_time = time.time() - start_time
             self.audio_logger.log_audio_success("Whisper model loading", load_time)
@@ -40,33 +103,100 @@ class WhisperSTTService:
             self.audio_logger.log_audio_error("Whisper model loading", e)
             raise
     
+    @staticmethod
+    def _cuda_available():
+        """Detect a GPU through CTranslate2 when faster-whisper is installed, so PyTorch is never imported for it"""
+        if WhisperModel is not None:
+            import ctranslate2
+            return ctranslate2.get_cuda_device_count() > 0
+        
+        import torch
+        return torch.cuda.is_available()
+    
+    def _create_model(self):
+        """Instantiate the Whisper model for the selected backend, device and compute type"""
+        if self.backend == "faster-whisper":
+            return WhisperModel(Config.WHISPER_MODEL, device=self.device, compute_type=self.compute_type)
+        
+        import whisper
+        model = whisper.load_model(Config.WHISPER_MODEL, device=self.device)
+        # Build the (lru-cached) mel filterbank now rather than inside the first request
+        whisper.audio.mel_filters(model.device, model.dims.n_mels)
+        # Keep FP16 weights on GPU; Whisper's layers cast per call, halving weight memory
+        return model.half() if self.device == "cuda" else model
+    
+    def _decode_in_memory(self, source):
+        """
+        Decode audio with libsndfile (WAV/FLAC/OGG) so OpenAI Whisper skips its ffmpeg subprocess
+        
+        Args:
+            source: File path or seekable binary file-like object
+        
+        Returns:
+            np.array: 16kHz float32 mono audio, or None when libsndfile can't read the format
+        """
+        position = source.tell() if hasattr(source, "tell") else None
+        try:
+            import soundfile as sf
+            audio, sample_rate = sf.read(source, dtype="float32")
+        except Exception as decode_error:
+            # Formats libsndfile can't read (e.g. webm) still go through ffmpeg
+            self.logger.debug(f"In-memory decode unavailable, using ffmpeg: {decode_error}")
+            if position is not None:
+                source.seek(position)
+            return None
+        return _to_whisper_input(audio, sample_rate)
+    
+    def _transcribe(self, audio, language=None):
+        """
+        Run the loaded backend on audio
+        
+        Args:
+            audio: File path, binary file-like object (faster-whisper only) or 16kHz float32 array
+            language (str, optional): Language code (e.g., 'en', 'es')
+        
+        Returns:
+            tuple: (text, detected language, audio duration in seconds or None, segments)
+        """
+        if self.backend == "faster-whisper":
+            segments, info = self.model.transcribe(
+                audio, language=language, beam_size=Config.WHISPER_BEAM_SIZE, vad_filter=True
+            )
+            # segments is a lazy generator; decoding happens while it is consumed
+            segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+            text = "".join(segment["text"] for segment in segments).strip()
+            return text, info.language, info.duration, segments
+        
+        if isinstance(audio, str):
+            decoded = self._decode_in_memory(audio)
+            if decoded is not None:
+                audio = decoded
+        
+        result = self.model.transcribe(audio, language=language, fp16=self.device == "cuda")
+        return result["text"].strip(), result.get("language", "unknown"), None, result.get("segments", [])
+    
     def transcribe_audio_file(self, audio_file_path, language=None):
         """
         Transcribe audio file to text
         
         Args:
-            audio_file_path (str): Path to audio file
+            audio_file_path: Path to audio file (or in-memory audio, see _transcribe)
             language (str, optional): Language code (e.g., 'en', 'es')
         
         Returns:
             dict: Transcription result with text and confidence
         """
         try:
-            self.audio_logger.log_audio_start("Audio transcription", audio_file_path)
+            self.audio_logger.log_audio_start(
+                "Audio transcription", audio_file_path if isinstance(audio_file_path, str) else "in-memory audio"
+            )
             start_time = time.time()
             
             # Transcribe the audio
-            if language:
-                result = self.model.transcribe(audio_file_path, language=language)
-            else:
-                result = self.model.transcribe(audio_file_path)
+            text, language_detected, audio_duration, segments = self._transcribe(audio_file_path, language)
             
             transcription_time = time.time() - start_time
             
-            # Extract text and confidence
-            text = result["text"].strip()
-            language_detected = result.get("language", "unknown")
-            
             self.audio_logger.log_audio_success("Audio transcription", transcription_time)
             self.logger.info(f"📝 Transcribed text length: {len(text)} characters")
             self.logger.info(f"🌍 Detected language: {language_detected}")
@@ -75,13 +205,60 @@ class WhisperSTTService:
                 "text": text,
                 "language": language_detected,
                 "duration": transcription_time,
-                "segments": result.get("segments", [])
+                "audio_duration": audio_duration,
+                "segments": segments
             }
             
         except Exception as e:
             self.audio_logger.log_audio_error("Audio transcription", e)
             raise
     
+    def transcribe_audio_stream(self, audio_stream, filename="temp_audio.wav"):
+        """
+        Transcribe audio from a binary file-like object (e.g. an upload's stream) without
+        reading it into a bytes object first
+        
+        Args:
+            audio_stream: Readable binary file object positioned at the start of the audio
+            filename (str): Original filename, used for the temporary file suffix
+        
+        Returns:
+            dict: Transcription result
+        """
+        if self.backend == "faster-whisper":
+            # faster-whisper decodes straight from the file object
+            try:
+                return self.transcribe_audio_file(audio_stream)
+            except Exception as e:
+                self.logger.error(f"❌ Error transcribing audio stream: {str(e)}")
+                raise
+        
+        # Seekable uploads in a libsndfile format decode in memory, without a temporary file or ffmpeg
+        seekable = hasattr(audio_stream, "seekable") and audio_stream.seekable()
+        audio = self._decode_in_memory(audio_stream) if seekable else None
+        if audio is not None:
+            try:
+                return self.transcribe_audio_file(audio)
+            except Exception as e:
+                self.logger.error(f"❌ Error transcribing audio stream: {str(e)}")
+                raise
+        
+        temp_path = None
+        try:
+            # OpenAI Whisper needs a path for the rest; copy the stream over in chunks
+            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1] or ".wav") as temp_file:
+                temp_path = temp_file.name
+                shutil.copyfileobj(audio_stream, temp_file)
+            
+            return self.transcribe_audio_file(temp_path)
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error transcribing audio stream: {str(e)}")
+            raise
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
     def transcribe_audio_bytes(self, audio_bytes, filename="temp_audio.wav"):
         """
         Transcribe audio from bytes data
@@ -93,6 +270,23 @@ class WhisperSTTService:
         Returns:
             dict: Transcription result
         """
+        if self.backend == "faster-whisper":
+            # faster-whisper decodes file-like objects directly, no temporary file needed
+            try:
+                return self.transcribe_audio_file(io.BytesIO(audio_bytes))
+            except Exception as e:
+                self.logger.error(f"❌ Error transcribing audio bytes: {str(e)}")
+                raise
+        
+        # OpenAI Whisper takes arrays directly; decode in memory and skip the ffmpeg fork
+        audio = self._decode_in_memory(io.BytesIO(audio_bytes))
+        if audio is not None:
+            try:
+                return self.transcribe_audio_file(audio)
+            except Exception as e:
+                self.logger.error(f"❌ Error transcribing audio bytes: {str(e)}")
+                raise
+        
         temp_path = None
         try:
             # Create temporary file
@@ -113,6 +307,13 @@ class WhisperSTTService:
             if temp_path and os.path.exists(temp_path):
                 os.remove(temp_path)
     
+    def _mono_buffer(self, frames):
+        """Return this thread's float32 scratch buffer sized to frames, growing it only when needed"""
+        buffer = getattr(self._scratch, "mono", None)
+        if buffer is None or buffer.shape[0] < frames:
+            buffer = self._scratch.mono = np.empty(frames, dtype=np.float32)
+        return buffer[:frames]
+    
     def process_realtime_audio(self, audio_data, sample_rate=16000):
         """
         Process real-time audio data
@@ -127,27 +328,9 @@ class WhisperSTTService:
         try:
             self.audio_logger.log_audio_start("Real-time audio processing")
             
-            # Ensure audio is in the right format
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)  # Convert stereo to mono
-            
-            # Normalize audio
-            audio_data = audio_data.astype(np.float32)
-            
-            # Resample if necessary
-            if sample_rate != 16000:
-                audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=16000)
-            
-            # Create temporary file for Whisper
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_path = temp_file.name
-                sf.write(temp_path, audio_data, 16000)
-            
-            try:
-                result = self.transcribe_audio_file(temp_path)
-                return result
-            finally:
-                os.remove(temp_path)
+            # Both backends accept 16kHz float32 mono arrays directly
+            # The scratch buffer is safe to reuse: transcription finishes consuming it before returning
+            return self.transcribe_audio_file(_to_whisper_input(audio_data, sample_rate, self._mono_buffer))
                 
         except Exception as e:
             self.audio_logger.log_audio_error("Real-time audio processing", e)
@@ -157,6 +340,8 @@ class WhisperSTTService:
         """Get information about the loaded model"""
         return {
             "model_name": Config.WHISPER_MODEL,
-            "device": next(self.model.parameters()).device.type if self.model else "unknown",
+            "backend": self.backend or "unknown",
+            "device": self.device if self.model else "unknown",
+            "compute_type": self.compute_type or "unknown",
             "model_size": Config.WHISPER_MODEL
         }
\ No newline at end of file
@@ -0,0 +1,262 @@
+# app/services/cache_service.py
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from logger_config import get_logger, log_info
+
+class SemanticCache:
+    """
+    In-process semantic response cache keyed by query embedding (cosine similarity lookup)
+
+    With a generation callable (e.g. VectorStore.get_generation), entries are dropped as soon as
+    the document collection changes, including uploads handled by another worker process.
+
+    Unit query vectors live in one preallocated, densely packed float32 matrix (row per entry),
+    so a lookup is a single BLAS matrix-vector product with no per-query stacking.
+    """
+
+    def __init__(self, embeddings, max_entries=1000, threshold=0.95, ttl_seconds=3600, generation=None):
+        self.logger = get_logger("semantic_cache")
+        self.embeddings = embeddings
+        self.generation = generation
+        self._generation_seen = generation() if generation else None
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> response, least recently used first
+        self._matrix = None  # (max_entries, dim) unit vectors, allocated on the first store
+        self._created = np.empty(max_entries, dtype=np.float64)  # Insert time per row
+        self._row_keys = []  # Row -> key; rows [0, len) are live
+        self._rows = {}  # Key -> row
+        self._lock = threading.Lock()
+        self._next_key = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize_query(query):
+        """Collapse case and whitespace so trivially different phrasings share one embedding"""
+        return " ".join(query.lower().split())
+
+    def embed(self, query):
+        """Embed a query once as a unit vector, for use with lookup() and store()"""
+        vector = np.asarray(self.embeddings.embed_query(self._normalize_query(query)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, vector):
+        """Return the cached response for the most similar query above the threshold, or None"""
+        with self._lock:
+            self._check_generation()
+            self._evict_expired()
+
+            size = len(self._row_keys)
+            if not size:
+                self.misses += 1
+                return None
+
+            scores = self._matrix[:size] @ vector
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            # Refresh LRU position
+            key = self._row_keys[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.logger.debug("[CACHE] Semantic cache hit (similarity %.4f)", scores[best])
+            return self._entries[key]
+
+    def store(self, vector, response):
+        """Cache a response under its query embedding, evicting the least recently used entry"""
+        with self._lock:
+            self._check_generation()
+            if not self.max_entries:
+                return
+            if self._matrix is None:
+                self._matrix = np.empty((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+            key = self._next_key
+            self._next_key += 1
+            row = len(self._row_keys)
+            self._matrix[row] = vector
+            self._created[row] = time.time()
+            self._row_keys.append(key)
+            self._rows[key] = row
+            self._entries[key] = response
+
+    def _remove(self, key):
+        """Drop one entry, moving the last row into its slot to keep rows dense. Caller holds the lock."""
+        del self._entries[key]
+        row = self._rows.pop(key)
+        last_key = self._row_keys.pop()
+        if last_key != key:
+            last = len(self._row_keys)
+            self._matrix[row] = self._matrix[last]
+            self._created[row] = self._created[last]
+            self._row_keys[row] = last_key
+            self._rows[last_key] = row
+
+    def _clear(self):
+        """Drop every entry. Caller holds the lock."""
+        self._entries.clear()
+        self._row_keys.clear()
+        self._rows.clear()
+
+    def invalidate(self):
+        """Drop all cached responses (e.g. after new documents are uploaded)"""
+        with self._lock:
+            count = len(self._entries)
+            self._clear()
+        log_info(self.logger, f"Semantic cache invalidated ({count} entries removed)")
+        return count
+
+    def _check_generation(self):
+        """Drop everything if the documents changed since the entries were stored. Caller holds the lock."""
+        if self.generation is None:
+            return
+        current = self.generation()
+        if current != self._generation_seen:
+            if self._entries:
+                self.logger.debug("[CACHE] Documents changed, dropping %d cached responses", len(self._entries))
+            self._clear()
+            self._generation_seen = current
+
+    def _evict_expired(self):
+        """Remove entries older than the TTL"""
+        size = len(self._row_keys)
+        if not size:
+            return
+        expired = np.flatnonzero(self._created[:size] < time.time() - self.ttl_seconds)
+        # Resolve keys first: removal moves rows around
+        for key in [self._row_keys[row] for row in expired]:
+            self._remove(key)
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+class TTSAudioCache:
+    """
+    Persistent (text, language) -> synthesized audio cache, so repeated phrases skip the TTS engine
+
+    Keys are a BLAKE2b digest of the engine namespace, language and text; audio bytes live in a
+    small SQLite table bounded by total size. A bounded in-process LRU serves the hottest clips
+    (the fixed "no documents" replies) without touching SQLite.
+    """
+
+    def __init__(self, path, namespace, max_bytes=200 * 1024 * 1024, memory_entries=256):
+        self.logger = get_logger("tts_cache")
+        self.path = path
+        self.namespace = namespace.encode("utf-8") + b"\0"
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> audio bytes, most recently used last
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS tts_audio (hash BLOB PRIMARY KEY, audio BLOB NOT NULL, size INTEGER NOT NULL)")
+        self._conn.commit()
+        # Stored bytes as seen by this process, so put() doesn't SUM the table per write; see put()
+        self._total_bytes = self._stored_bytes()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text, language):
+        """Digest of namespace + language + text; the namespace keeps different engines/voices apart"""
+        return hashlib.blake2b(
+            self.namespace + language.encode("utf-8") + b"\0" + text.strip().encode("utf-8"), digest_size=16
+        ).digest()
+
+    def _remember(self, key, audio):
+        """Insert into the in-process LRU, evicting the least recently used entry. Caller holds the lock."""
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text, language):
+        """Return cached audio bytes for text in language, or None"""
+        key = self._key(text, language)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._conn.execute("SELECT audio FROM tts_audio WHERE hash = ?", (key,)).fetchone()
+                if row is not None:
+                    audio = bytes(row[0])
+                    self._remember(key, audio)
+
+            if audio is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return audio
+
+    def _stored_bytes(self):
+        """Total audio bytes in the table (a full scan; only at open and when pruning)"""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tts_audio").fetchone()[0]
+
+    def put(self, text, language, audio):
+        """Store freshly synthesized audio, pruning the oldest clips past max_bytes"""
+        key = self._key(text, language)
+        with self._lock:
+            self._remember(key, audio)
+            replaced = self._conn.execute("SELECT size FROM tts_audio WHERE hash = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tts_audio (hash, audio, size) VALUES (?, ?, ?)", (key, audio, len(audio))
+            )
+            self._total_bytes += len(audio) - (replaced[0] if replaced else 0)
+
+            if self._total_bytes > self.max_bytes:
+                # Other workers write to the same table: re-read the real total before pruning, and
+                # prune to 90% of the cap so the next writes don't each pay for that scan
+                total = self._stored_bytes()
+                if total > self.max_bytes:
+                    target = self.max_bytes * 9 // 10
+                    # REPLACE re-inserts with a new rowid, so rowid order is least recently written first
+                    while total > target:
+                        rowid, size = self._conn.execute(
+                            "SELECT rowid, size FROM tts_audio ORDER BY rowid LIMIT 1"
+                        ).fetchone()
+                        self._conn.execute("DELETE FROM tts_audio WHERE rowid = ?", (rowid,))
+                        total -= size
+                self._total_bytes = total
+            self._conn.commit()
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_audio").fetchone()
+            memory_size = len(self._memory)
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "memory_entries": memory_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -1,23 +1,91 @@
 # app/services/llm_service.py
-from langchain_groq import ChatGroq
-from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import HumanMessage, AIMessage
-from langchain.prompts import PromptTemplate
+from langchain.schema import HumanMessage, AIMessage, SystemMessage
+import atexit
+import re
 import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+import httpx
 from config import Config
 from logger_config import get_logger, log_success, log_error, log_warning, log_info
 
+@dataclass(slots=True)
+class Source:
+    """One retrieved chunk as returned with an answer; orjson serializes it like the equivalent dict"""
+    id: int
+    content: str
+    metadata: dict
+    full_length: int
+
+
 class LLMService:
     """Enhanced LLM Service with strict document-only responses"""
     
+    # Identical for every query, so it forms a stable prompt prefix the provider can cache
+    DOCUMENT_QA_RULES = """Answer questions based ONLY on the document content provided by the user, in English.
+
+STRICT RULES:
+- Use ONLY information from the documents provided
+- If the answer is not in the documents, say "This information is not available in the uploaded documents"
+- Respond in English only
+- Be factual and direct
+- Do not add external knowledge"""
+    
+    # Fixed pieces of the per-query prompt, assembled around the retrieved chunks and the question
+    CONTEXT_HEADER = "DOCUMENT CONTENT:\n"
+    DOCUMENT_LABELS = ("Document 1:\n",) + tuple(f"\n\nDocument {i}:\n" for i in range(2, 9))
+    QUESTION_LABEL = "\n\nQUESTION: "
+    ANSWER_CUE = "\n\nANSWER (based strictly on the documents above, in English):"
+    
+    # Fixed head and tail of the document summary prompt
+    SUMMARY_PROMPT_HEAD = (
+        "Based on the following document excerpts, provide a brief summary of what these documents contain. "
+        "Respond in English only.\n\nDocument excerpts:\n"
+    )
+    SUMMARY_PROMPT_TAIL = "\n\nBrief summary of document content:"
+    
+    # Canned answers returned without an LLM call; fixed text, so their audio is synthesized once and cached
+    NO_DOCUMENTS_ANSWER = "No documents have been uploaded yet. Please upload documents first to get answers about their content."
+    NO_RELEVANT_DOCS_ANSWER = "This information is not available in the uploaded documents. The question may not be related to the uploaded content."
+    GENERIC_ANSWER_REPLACEMENT = "This information is not available in the uploaded documents. Please ensure your question relates to the uploaded content."
+    FIXED_ANSWERS = (NO_DOCUMENTS_ANSWER, NO_RELEVANT_DOCS_ANSWER, GENERIC_ANSWER_REPLACEMENT)
+    
+    # Phrase lists compiled once into case-insensitive alternations, so each answer is scanned in a
+    # single pass without a lowercased copy
+    GENERIC_PHRASES = re.compile("|".join(map(re.escape, (
+        "i don't know",
+        "i'm not sure",
+        "i apologize",
+        "i can't help",
+        "i don't have access",
+        "based on my knowledge",
+        "in general",
+        "typically",
+        "usually"
+    ))), re.IGNORECASE)
+    NO_INFO_PHRASES = re.compile("|".join(map(re.escape, (
+        "not available in the uploaded documents",
+        "information is not in the documents",
+        "not found in the uploaded content"
+    ))), re.IGNORECASE)
+    
     def __init__(self, vector_store):
         self.logger = get_logger("llm_service")
         self.vector_store = vector_store
         self.llm = None
-        self.memory = None
-        self.chain = None
-        self.conversation_history = []
+        # Ring buffer of the last 20 conversations; appends evict the oldest in O(1)
+        self.conversation_history = deque(maxlen=20)
+        # One pooled HTTP/2 client for every Groq call, so TCP+TLS setup is paid once per connection
+        self.http = httpx.Client(
+            http2=True,
+            timeout=Config.LLM_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_keepalive_connections=Config.LLM_HTTP_MAX_KEEPALIVE,
+                max_connections=Config.LLM_HTTP_MAX_CONNECTIONS
+            )
+        )
+        atexit.register(self.http.close)
         self._initialize_llm()
     
     def _initialize_llm(self):
@@ -26,56 +94,22 @@ class LLMService:
             log_info(self.logger, "Initializing LLM service")
             start_time = time.time()
             
+            # Imported here (on the service-init thread) rather than at app import, so the
+            # worker starts answering /health while the Groq/LangChain stack loads
+            from langchain_groq import ChatGroq
+            
             # Initialize the LLM with strict parameters
             self.llm = ChatGroq(
                 temperature=0.1,  # Lower temperature for more factual responses
                 model_name="llama-3.3-70b-versatile",
                 groq_api_key=Config.GROQ_API_KEY,
-                max_tokens=1024  # Reduced for more focused responses
-            )
-            
-            # Initialize memory
-            self.memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True,
-                output_key="answer"
+                max_tokens=1024,  # Reduced for more focused responses
+                http_client=self.http
             )
             
-            # Create custom prompt template for document-only responses
-            custom_prompt = PromptTemplate(
-                input_variables=["context", "question", "chat_history"],
-                template="""You are an AI assistant that answers questions STRICTLY based on the provided document content.
-
-IMPORTANT RULES:
-1. Answer ONLY based on the context provided below
-2. If the information is not in the context, say "This information is not available in the uploaded documents"
-3. Always respond in English only
-4. Do not make assumptions or add information not in the documents
-5. Be direct and factual
-
-Context from uploaded documents:
-{context}
-
-Previous conversation:
-{chat_history}
-
-Question: {question}
-
-Answer based strictly on the document context above (English only):"""
-            )
-            
-            # Initialize the conversation chain with custom prompt
-            self.chain = ConversationalRetrievalChain.from_llm(
-                llm=self.llm,
-                retriever=self.vector_store.vector_store.as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": 6}  # Get more documents for better context
-                ),
-                memory=self.memory,
-                return_source_documents=True,
-                combine_docs_chain_kwargs={"prompt": custom_prompt},
-                verbose=False
-            )
+            # Answers are generated with one direct LLM call per query (see _prepare_query), so no
+            # retrieval chain or LangChain memory is built: each would only add init work and resident
+            # objects nothing reads. Recent exchanges are kept in conversation_history
             
             init_time = time.time() - start_time
             log_success(self.logger, f"LLM service initialized successfully in {init_time:.2f}s")
@@ -99,116 +133,242 @@ Answer based strictly on the document context above (English only):"""
             log_info(self.logger, f"Processing query: '{query[:100]}...'")
             start_time = time.time()
             
-            # First check if we have any documents
-            collection_info = self.vector_store.get_collection_info()
-            if collection_info.get("document_count", 0) == 0:
-                return {
-                    "answer": "No documents have been uploaded yet. Please upload documents first to get answers about their content.",
-                    "response_time": 0,
-                    "query": query,
-                    "sources": []
-                }
-            
-            # Get relevant documents first to validate we have content
-            relevant_docs = self.vector_store.similarity_search(query, k=6)
-            
-            if not relevant_docs:
-                return {
-                    "answer": "This information is not available in the uploaded documents. The question may not be related to the uploaded content.",
-                    "response_time": 0,
-                    "query": query,
-                    "sources": []
-                }
-            
-            # Create strict context-only prompt
-            context = "\n\n".join([
-                f"Document {i+1}:\n{doc.page_content}" 
-                for i, doc in enumerate(relevant_docs)
-            ])
-            
-            # Enhanced prompt to ensure document-only responses
-            strict_prompt = f"""Based ONLY on the following document content, answer the question in English.
-
-STRICT RULES:
-- Use ONLY information from the documents below
-- If the answer is not in the documents, say "This information is not available in the uploaded documents"
-- Respond in English only
-- Be factual and direct
-- Do not add external knowledge
-
-DOCUMENT CONTENT:
-{context}
-
-QUESTION: {query}
-
-ANSWER (based strictly on the documents above, in English):"""
+            early_result, relevant_docs, messages = self._prepare_query(query)
+            if early_result is not None:
+                return early_result
             
             # Get response using direct LLM call for better control
-            messages = [HumanMessage(content=strict_prompt)]
-            response = self.llm(messages)
+            response = self.llm.invoke(messages)
             
-            response_time = time.time() - start_time
-            answer = response.content.strip()
+            answer, _ = self._finalize_answer(response.content)
+            return self._build_result(query, answer, relevant_docs, include_sources, time.time() - start_time)
             
-            # Validate that the response seems document-based
-            if self._is_generic_response(answer):
-                answer = "This information is not available in the uploaded documents. Please ensure your question relates to the uploaded content."
+        except Exception as e:
+            log_error(self.logger, f"Error getting LLM response: {str(e)}")
+            return self._error_result(query, e)
+    
+    def get_responses(self, queries, include_sources=True):
+        """
+        Answer several queries at once, overlapping their Groq round trips
+        
+        Retrieval runs as one batched similarity search, and the LLM calls go out
+        concurrently (up to Config.LLM_BATCH_CONCURRENCY in flight) over the pooled client.
+        
+        Args:
+            queries (list): User queries
+            include_sources (bool): Whether to include source documents
+        
+        Returns:
+            list: One get_response()-style dict per query, in input order
+        """
+        try:
+            log_info(self.logger, f"Processing batch of {len(queries)} queries")
+            start_time = time.time()
             
-            # Log response details
-            log_success(self.logger, f"Generated response in {response_time:.2f}s")
-            log_info(self.logger, f"Response length: {len(answer)} characters")
-            log_info(self.logger, f"Sources used: {len(relevant_docs)} documents")
+            results = [None] * len(queries)
+            pending = []  # (index, relevant_docs, messages) for queries that need the LLM
+            for i, (query, docs) in enumerate(zip(queries, self.vector_store.similarity_search_batch(queries, k=6))):
+                early_result, relevant_docs, messages = self._prepare_query(query, relevant_docs=docs)
+                if early_result is not None:
+                    results[i] = early_result
+                else:
+                    pending.append((i, relevant_docs, messages))
+            
+            responses = self.llm.batch(
+                [messages for _, _, messages in pending],
+                config={"max_concurrency": Config.LLM_BATCH_CONCURRENCY},
+                return_exceptions=True
+            ) if pending else []
+            
+            for (i, relevant_docs, _), response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    log_error(self.logger, f"Error getting LLM response in batch: {str(response)}")
+                    results[i] = self._error_result(queries[i], response)
+                    continue
+                answer, _ = self._finalize_answer(response.content)
+                results[i] = self._build_result(queries[i], answer, relevant_docs, include_sources, time.time() - start_time)
+            
+            return results
             
-            # Store conversation in history
-            self._add_to_history(query, answer)
+        except Exception as e:
+            log_error(self.logger, f"Error getting batched LLM responses: {str(e)}")
+            return [self._error_result(query, e) for query in queries]
+    
+    def stream_response(self, query, include_sources=True):
+        """
+        Stream the response from the LLM as it is generated
+        
+        Args:
+            query (str): User query
+            include_sources (bool): Whether to include source documents
+        
+        Yields:
+            dict: {"token": str} events while generating, then a final event with
+                "done": True plus the same fields as get_response(). "answer_replaced"
+                is True when the streamed text was swapped for the not-available reply.
+        """
+        try:
+            log_info(self.logger, f"Streaming query: '{query[:100]}...'")
+            start_time = time.time()
             
-            # Prepare response
-            result = {
-                "answer": answer,
-                "response_time": response_time,
-                "query": query
-            }
+            early_result, relevant_docs, messages = self._prepare_query(query)
+            if early_result is not None:
+                yield {"token": early_result["answer"]}
+                yield dict(early_result, done=True, answer_replaced=False)
+                return
             
-            if include_sources and relevant_docs:
-                result["sources"] = self._format_sources(relevant_docs)
-            else:
-                result["sources"] = []
+            parts = []
+            for chunk in self.llm.stream(messages):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield {"token": chunk.content}
             
-            return result
+            answer, replaced = self._finalize_answer("".join(parts))
+            result = self._build_result(query, answer, relevant_docs, include_sources, time.time() - start_time)
+            yield dict(result, done=True, answer_replaced=replaced)
             
         except Exception as e:
-            log_error(self.logger, f"Error getting LLM response: {str(e)}")
+            log_error(self.logger, f"Error streaming LLM response: {str(e)}")
+            yield dict(self._error_result(query, e), done=True, answer_replaced=True)
+    
+    def _prepare_query(self, query, relevant_docs=None):
+        """
+        Run the document checks and retrieval shared by get_response and stream_response
+        
+        Args:
+            query (str): User query
+            relevant_docs (list, optional): Already retrieved documents (batched retrieval)
+        
+        Returns:
+            tuple: (early_result, relevant_docs, messages) - early_result is a complete
+                response dict when no LLM call is needed, otherwise None
+        """
+        # First check if we have any documents
+        # Cached count in-process, so this adds no Chroma round trip ahead of the retrieval
+        if self.vector_store.get_document_count() == 0:
             return {
-                "answer": "I encountered an error processing your request. Please try again.",
-                "error": str(e),
+                "answer": self.NO_DOCUMENTS_ANSWER,
                 "response_time": 0,
                 "query": query,
                 "sources": []
-            }
+            }, [], None
+        
+        # Get relevant documents first to validate we have content
+        if relevant_docs is None:
+            relevant_docs = self.vector_store.similarity_search(query, k=6)
+        
+        if not relevant_docs:
+            return {
+                "answer": self.NO_RELEVANT_DOCS_ANSWER,
+                "response_time": 0,
+                "query": query,
+                "sources": []
+            }, [], None
+        
+        # Create strict context-only prompt. Chunks go in a canonical order (not rank order), so
+        # questions that retrieve the same chunks send a byte-identical prefix up to the question
+        # and the provider's prompt/KV cache can reuse its prefill. The returned sources keep rank order
+        packed = self._pack_context(relevant_docs)
+        relevant_docs = [doc for doc, _ in packed]
+        context = sorted(
+            packed,
+            key=lambda item: (str(item[0].metadata.get('source', '')), item[0].metadata.get('page', 0), item[1])
+        )
+        # One join over prebuilt pieces; only the chunk labels and texts vary per request
+        labels = self.DOCUMENT_LABELS
+        parts = [self.CONTEXT_HEADER]
+        for i, (_, text) in enumerate(context):
+            parts += (labels[i] if i < len(labels) else f"\n\nDocument {i+1}:\n", text)
+        parts += (self.QUESTION_LABEL, query, self.ANSWER_CUE)
+        
+        messages = [
+            SystemMessage(content=self.DOCUMENT_QA_RULES),
+            HumanMessage(content="".join(parts))
+        ]
+        
+        return None, relevant_docs, messages
+    
+    @staticmethod
+    def _pack_context(docs):
+        """
+        Fit retrieved chunks into the prompt's character budget, best-ranked first
+        
+        Args:
+            docs (list): Retrieved documents in rank order
+        
+        Returns:
+            list: (document, text) pairs, each text cut to Config.LLM_CONTEXT_DOC_MAX_CHARS on a
+                word boundary, stopping once Config.LLM_CONTEXT_MAX_CHARS would be exceeded
+        """
+        per_doc = Config.LLM_CONTEXT_DOC_MAX_CHARS
+        remaining = Config.LLM_CONTEXT_MAX_CHARS
+        packed = []
+        for doc in docs:
+            limit = min(per_doc, remaining)
+            if limit <= 0:
+                break
+            text = doc.page_content
+            if len(text) > limit:
+                cut = text.rfind(" ", 0, limit)
+                text = text[:cut if cut > 0 else limit]
+            packed.append((doc, text))
+            remaining -= len(text)
+        return packed
+    
+    def _finalize_answer(self, raw_answer):
+        """Strip the answer and replace it if it seems generic; returns (answer, replaced)"""
+        answer = raw_answer.strip()
+        
+        # Validate that the response seems document-based
+        if self._is_generic_response(answer):
+            return self.GENERIC_ANSWER_REPLACEMENT, True
+        
+        return answer, False
+    
+    def _build_result(self, query, answer, relevant_docs, include_sources, response_time):
+        """Log, record history and build the response dict for a generated answer"""
+        # Log response details
+        log_success(self.logger, f"Generated response in {response_time:.2f}s")
+        log_info(self.logger, f"Response length: {len(answer)} characters")
+        log_info(self.logger, f"Sources used: {len(relevant_docs)} documents")
+        
+        # Store conversation in history
+        self._add_to_history(query, answer)
+        
+        # Prepare response
+        result = {
+            "answer": answer,
+            "response_time": response_time,
+            "query": query
+        }
+        
+        if include_sources and relevant_docs:
+            result["sources"] = self._format_sources(relevant_docs)
+        else:
+            result["sources"] = []
+        
+        return result
+    
+    def _error_result(self, query, error):
+        """Build the response dict returned when answering fails"""
+        return {
+            "answer": "I encountered an error processing your request. Please try again.",
+            "error": str(error),
+            "response_time": 0,
+            "query": query,
+            "sources": []
+        }
     
     def _is_generic_response(self, response):
         """Check if response seems too generic (not document-based)"""
-        generic_phrases = [
-            "i don't know",
-            "i'm not sure",
-            "i apologize",
-            "i can't help",
-            "i don't have access",
-            "based on my knowledge",
-            "in general",
-            "typically",
-            "usually"
-        ]
-        
-        response_lower = response.lower()
-        return any(phrase in response_lower for phrase in generic_phrases)
+        return self.GENERIC_PHRASES.search(response) is not None
     
     def get_document_summary(self):
         """Get a summary of uploaded documents"""
         try:
-            collection_info = self.vector_store.get_collection_info()
+            document_count = self.vector_store.get_document_count()
             
-            if collection_info.get("document_count", 0) == 0:
+            if document_count == 0:
                 return {
                     "summary": "No documents uploaded",
                     "document_count": 0
@@ -220,25 +380,23 @@ ANSWER (based strictly on the documents above, in English):"""
             if not sample_docs:
                 return {
                     "summary": "Documents uploaded but content not accessible",
-                    "document_count": collection_info.get("document_count", 0)
+                    "document_count": document_count
                 }
             
-            # Create summary prompt
-            context = "\n\n".join([doc.page_content[:300] for doc in sample_docs])
-            
-            prompt = f"""Based on the following document excerpts, provide a brief summary of what these documents contain. Respond in English only.
-
-Document excerpts:
-{context}
-
-Brief summary of document content:"""
+            # Create summary prompt, joined once around the excerpts
+            parts = [self.SUMMARY_PROMPT_HEAD]
+            for i, doc in enumerate(sample_docs):
+                if i:
+                    parts.append("\n\n")
+                parts.append(doc.page_content[:300])
+            parts.append(self.SUMMARY_PROMPT_TAIL)
             
-            messages = [HumanMessage(content=prompt)]
-            response = self.llm(messages)
+            messages = [HumanMessage(content="".join(parts))]
+            response = self.llm.invoke(messages)
             
             return {
                 "summary": response.content.strip(),
-                "document_count": collection_info.get("document_count", 0)
+                "document_count": document_count
             }
             
         except Exception as e:
@@ -251,19 +409,11 @@ Brief summary of document content:"""
     def _format_sources(self, source_documents):
         """Format source documents for response"""
         sources = []
-        for i, doc in enumerate(source_documents):
-            # Get first 200 characters as preview
-            content_preview = doc.page_content[:200]
-            if len(doc.page_content) > 200:
-                content_preview += "..."
-            
-            source = {
-                "id": i + 1,
-                "content": content_preview,
-                "metadata": doc.metadata,
-                "full_length": len(doc.page_content)
-            }
-            sources.append(source)
+        for i, doc in enumerate(source_documents, 1):
+            content = doc.page_content
+            length = len(content)
+            # First 200 characters as preview
+            sources.append(Source(i, content[:200] + "..." if length > 200 else content, doc.metadata, length))
         return sources
     
     def _add_to_history(self, query, answer):
@@ -274,20 +424,16 @@ Brief summary of document content:"""
             "answer": answer
         }
         self.conversation_history.append(conversation)
-        
-        # Keep only last 20 conversations
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
     
     def get_conversation_history(self, limit=10):
         """Get recent conversation history"""
-        return self.conversation_history[-limit:]
+        history = self.conversation_history
+        return list(islice(history, max(0, len(history) - limit), None))
     
     def clear_memory(self):
         """Clear conversation memory"""
         try:
-            self.memory.clear()
-            self.conversation_history = []
+            self.conversation_history.clear()
             log_info(self.logger, "Conversation memory cleared")
             return True
         except Exception as e:
@@ -297,31 +443,22 @@ Brief summary of document content:"""
     def validate_document_response(self, query, answer):
         """Validate that response is based on documents"""
         # Check if we have documents
-        collection_info = self.vector_store.get_collection_info()
-        if collection_info.get("document_count", 0) == 0:
+        if self.vector_store.get_document_count() == 0:
             return False
         
         # Check if answer indicates no information found
-        no_info_phrases = [
-            "not available in the uploaded documents",
-            "information is not in the documents",
-            "not found in the uploaded content"
-        ]
-        
-        return not any(phrase in answer.lower() for phrase in no_info_phrases)
+        return self.NO_INFO_PHRASES.search(answer) is None
     
     def get_model_info(self):
         """Get information about the LLM model"""
-        collection_info = self.vector_store.get_collection_info()
-        
         return {
             "model_name": "llama-3.3-70b-versatile",
             "provider": "Groq",
             "temperature": 0.1,
             "max_tokens": 1024,
-            "memory_type": "ConversationBufferMemory",
+            "memory_type": "In-process history (last 20 exchanges)",
             "retriever_k": 6,
-            "document_count": collection_info.get("document_count", 0),
+            "document_count": self.vector_store.get_document_count(),
             "response_language": "English only",
             "response_mode": "Document content only",
             "strict_mode": True
@@ -335,7 +472,7 @@ Brief summary of document content:"""
                 return False
                 
             test_messages = [HumanMessage(content="Respond with 'OK' in English")]
-            response = self.llm(test_messages)
+            response = self.llm.invoke(test_messages)
             
             if response and response.content:
                 log_success(self.logger, "LLM service health check passed")
@@ -351,9 +488,9 @@ Brief summary of document content:"""
     def get_available_documents_info(self):
         """Get information about available documents for queries"""
         try:
-            collection_info = self.vector_store.get_collection_info()
+            document_count = self.vector_store.get_document_count()
             
-            if collection_info.get("document_count", 0) == 0:
+            if document_count == 0:
                 return {
                     "has_documents": False,
                     "message": "No documents uploaded. Please upload documents to enable Q&A functionality.",
@@ -366,8 +503,8 @@ Brief summary of document content:"""
             return {
                 "has_documents": True,
                 "message": "Documents are available for questions",
-                "document_count": collection_info.get("document_count", 0),
-                "sample_content": [doc.page_content[:100] + "..." for doc in sample_docs[:2]]
+                "document_count": document_count,
+                "sample_content": [doc.page_content[:100] + "..." for doc in sample_docs]
             }
             
         except Exception as e:
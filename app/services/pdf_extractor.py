@@ -0,0 +1,54 @@
+# app/services/pdf_extractor.py
+import io
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pypdf import PdfReader
+from config import Config
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _extract_page_range(data, start, stop):
+    """Worker: parse the PDF from bytes and extract text for pages [start, stop)"""
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _get_pool():
+    """Create the extraction process pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a worker that already holds loaded models and running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+def extract_pdf_pages(data):
+    """
+    Extract the text of every page of a PDF
+    
+    Args:
+        data (bytes): PDF file contents
+    
+    Returns:
+        list: Page texts in page order
+    """
+    reader = PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    
+    if page_count < Config.PDF_PARALLEL_MIN_PAGES or Config.PDF_EXTRACT_WORKERS < 2:
+        return [page.extract_text() or "" for page in reader.pages]
+    
+    # One contiguous page range per worker, so each process parses the file only once
+    workers = min(Config.PDF_EXTRACT_WORKERS, page_count)
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    
+    pool = _get_pool()
+    futures = [pool.submit(_extract_page_range, data, start, stop) for start, stop in ranges]
+    return [text for future in futures for text in future.result()]
@@ -1,19 +1,63 @@
 import os
+import io
+import re
 import time
+import wave
+import atexit
 import tempfile
 import base64
-from gtts import gTTS
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
 from config import Config
 from logger_config import get_logger, AudioLogger
 
+# Split point after sentence-ending punctuation, for synthesizing long text sentence by sentence
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+class _KeepAliveSession(requests.Session):
+    """requests.Session that outlives gTTS's per-request `with requests.Session()` block"""
+
+    def __exit__(self, *args):
+        pass  # Keep the pooled connections warm; closed once at interpreter exit
+
+
+class _PooledRequests:
+    """Stand-in for the requests module inside gtts.tts that hands every call one shared session"""
+
+    def __init__(self, session):
+        self._session = session
+
+    def Session(self):
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
 
 class GoogleTTSService:
     """Text-to-Speech service using gTTS (Google TTS) - Free Service"""
 
+    audio_format = "mp3"
+    mimetype = "audio/mpeg"
+
     def __init__(self):
         self.logger = get_logger("gtts")
         self.audio_logger = AudioLogger("gtts")
         self.language = "en"
+        # Imported here so Piper-only processes never load gTTS
+        import gtts.tts
+        self._gtts = gtts.tts.gTTS
+        # gTTS opens (and closes) a new HTTPS connection per request; route it through one
+        # keep-alive pool so consecutive calls reuse a warm TCP+TLS connection
+        self._session = _KeepAliveSession()
+        self._session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=Config.GTTS_HTTP_MAX_CONNECTIONS))
+        gtts.tts.requests = _PooledRequests(self._session)
+        atexit.register(self._session.close)
+        # Optional TTSAudioCache, attached by the app; repeated phrases skip the Google round trip
+        self.audio_cache = None
+        self.cache_namespace = "gtts"
         self.logger.info("🎤 GoogleTTSService initialized successfully")
 
     def text_to_speech_file(self, text, output_path=None, language="en"):
@@ -29,37 +73,21 @@ class GoogleTTSService:
             str: Path to the generated audio file
         """
         try:
-            self.audio_logger.log_audio_start("Text-to-speech conversion")
-            start_time = time.time()
-
-            if not text or not text.strip():
-                raise ValueError("Text cannot be empty")
+            audio_bytes = self.text_to_speech_bytes(text, language=language)
 
             if output_path is None:
-                output_path = tempfile.mktemp(suffix=".mp3")  # gTTS outputs mp3
-
-            self.logger.info(f"🔄 Converting text to speech: '{text[:50]}...'")
-            
-            # Generate speech
-            tts = gTTS(text=text, lang=language, slow=False)
-            tts.save(output_path)
-
-            # Verify file was created
-            if not os.path.exists(output_path):
-                raise Exception("Audio file was not created")
-
-            file_size = os.path.getsize(output_path)
-            conversion_time = time.time() - start_time
-            
-            self.audio_logger.log_audio_success("Text-to-speech conversion", conversion_time)
-            self.logger.info(f"📝 Converted text length: {len(text)} characters")
-            self.logger.info(f"🎵 Generated audio file: {output_path} ({file_size} bytes)")
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:  # gTTS outputs mp3
+                    output_path = temp_file.name
+                    temp_file.write(audio_bytes)
+            else:
+                with open(output_path, 'wb') as audio_file:
+                    audio_file.write(audio_bytes)
 
+            self.logger.info(f"🎵 Generated audio file: {output_path} ({len(audio_bytes)} bytes)")
             return output_path
 
         except Exception as e:
-            self.audio_logger.log_audio_error("Text-to-speech conversion", e)
-            self.logger.error(f"❌ Text-to-speech conversion failed: {str(e)}")
+            self.logger.error(f"❌ Error saving speech to file: {str(e)}")
             raise
 
     def text_to_speech_bytes(self, text, language="en"):
@@ -73,28 +101,45 @@ class GoogleTTSService:
         Returns:
             bytes: Audio data as bytes
         """
-        temp_path = None
         try:
-            self.logger.info(f"🔄 Converting text to audio bytes: '{text[:30]}...'")
-            temp_path = self.text_to_speech_file(text, language=language)
-            
-            with open(temp_path, 'rb') as audio_file:
-                audio_bytes = audio_file.read()
-            
+            self.audio_logger.log_audio_start("Text-to-speech conversion")
+            start_time = time.time()
+
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+
+            if self.audio_cache is not None:
+                audio_bytes = self.audio_cache.get(text, language)
+                if audio_bytes is not None:
+                    self.logger.debug("[CACHE] TTS cache hit for '%s...'", text[:50])
+                    return audio_bytes
+
+            self.logger.info(f"🔄 Converting text to speech: '{text[:50]}...'")
+
+            audio_bytes = self._synthesize(text, language)
+
+            if not audio_bytes:
+                raise Exception("No audio was generated")
+
+            if self.audio_cache is not None:
+                self.audio_cache.put(text, language, audio_bytes)
+
+            conversion_time = time.time() - start_time
+            self.audio_logger.log_audio_success("Text-to-speech conversion", conversion_time)
+            self.logger.info(f"📝 Converted text length: {len(text)} characters")
             self.logger.info(f"✅ Generated audio bytes: {len(audio_bytes)} bytes")
             return audio_bytes
-            
+
         except Exception as e:
-            self.logger.error(f"❌ Error converting text to speech bytes: {str(e)}")
+            self.audio_logger.log_audio_error("Text-to-speech conversion", e)
+            self.logger.error(f"❌ Text-to-speech conversion failed: {str(e)}")
             raise
-        finally:
-            # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                    self.logger.debug(f"🗑️ Cleaned up temporary file: {temp_path}")
-                except Exception as cleanup_error:
-                    self.logger.warning(f"⚠️ Failed to cleanup temp file: {cleanup_error}")
+
+    def _synthesize(self, text, language):
+        """Generate speech straight into memory (no temporary file round trip), bypassing audio_cache"""
+        buffer = io.BytesIO()
+        self._gtts(text=text, lang=language, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
 
     def text_to_speech_base64(self, text, language="en"):
         """
@@ -109,8 +154,8 @@ class GoogleTTSService:
         """
         try:
             self.logger.info(f"🔄 Converting text to base64 audio: '{text[:30]}...'")
-            audio_bytes = self.text_to_speech_bytes(text, language=language)
-            base64_audio = base64.b64encode(audio_bytes).decode('utf-8')
+            # Chained so the raw audio is released before the encoded bytes are copied into a str
+            base64_audio = base64.b64encode(self.text_to_speech_bytes(text, language=language)).decode('ascii')
             
             self.logger.info(f"🔐 Generated base64 audio (length: {len(base64_audio)})")
             return base64_audio
@@ -119,6 +164,10 @@ class GoogleTTSService:
             self.logger.error(f"❌ Error converting text to base64 audio: {str(e)}")
             raise
 
+    def combine_audio(self, clips):
+        """Join clips into one stream; MP3 frames are self-delimiting, so plain concatenation plays back"""
+        return b"".join(clips)
+
     def get_available_languages(self):
         """Return supported languages by gTTS"""
         return {
@@ -162,9 +211,9 @@ class GoogleTTSService:
         try:
             self.logger.info("🔍 Performing TTS health check...")
             
-            # Test with a simple phrase
+            # Test with a simple phrase; skips audio_cache so the probe really reaches Google
             test_text = "Health check test"
-            audio_bytes = self.text_to_speech_bytes(test_text)
+            audio_bytes = self._synthesize(test_text, "en")
             
             if len(audio_bytes) > 0:
                 self.logger.info("✅ TTS health check passed")
@@ -178,6 +227,216 @@ class GoogleTTSService:
             return False
 
 
+class PiperTTSService:
+    """Text-to-Speech service using local Piper ONNX voices - no network calls"""
+
+    audio_format = "wav"
+    mimetype = "audio/wav"
+
+    def __init__(self):
+        self.logger = get_logger("piper_tts")
+        self.audio_logger = AudioLogger("piper_tts")
+        self.language = Config.DEFAULT_TTS_LANGUAGE
+        self.use_cuda = False
+        self.voices = {}
+        # Optional TTSAudioCache, attached by the app; repeated phrases skip synthesis
+        self.audio_cache = None
+        self._load_voices()
+        # Cached audio depends on the exact voice models, so they are part of the cache key
+        self.cache_namespace = "piper:" + ",".join(sorted(Config.PIPER_VOICES[lang] for lang in self.voices))
+        self.logger.info("🎤 PiperTTSService initialized successfully")
+
+    def _load_voices(self):
+        """Load every configured voice that exists on disk into an ONNX Runtime session"""
+        from piper.voice import PiperVoice
+        import onnxruntime
+
+        self.use_cuda = "CUDAExecutionProvider" in onnxruntime.get_available_providers()
+        self.logger.info(f"🔧 Using device: {'cuda' if self.use_cuda else 'cpu'}")
+
+        for language, filename in Config.PIPER_VOICES.items():
+            model_path = os.path.join(Config.PIPER_VOICES_DIR, filename)
+            if not os.path.exists(model_path):
+                self.logger.warning(f"⚠️ Piper voice not found: {model_path}")
+                continue
+
+            self.audio_logger.log_audio_start("Loading Piper voice", model_path)
+            start_time = time.time()
+            self.voices[language] = PiperVoice.load(model_path, use_cuda=self.use_cuda)
+            self.audio_logger.log_audio_success("Piper voice loading", time.time() - start_time)
+
+        if not self.voices:
+            raise FileNotFoundError(f"No Piper voices found in {Config.PIPER_VOICES_DIR}")
+
+        if self.language not in self.voices:
+            self.language = next(iter(self.voices))
+
+    def _get_voice(self, language):
+        """Return the voice for a language, falling back to the default voice"""
+        voice = self.voices.get(language)
+        if voice is None:
+            self.logger.warning(f"⚠️ No Piper voice for '{language}'. Using '{self.language}'.")
+            voice = self.voices[self.language]
+        return voice
+
+    @staticmethod
+    def _to_wav(pcm, sample_rate):
+        """Wrap 16-bit mono PCM in a WAV header"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        return buffer.getvalue()
+
+    def text_to_speech_bytes(self, text, language="en"):
+        """
+        Convert text to speech and return as WAV bytes
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code (default: "en")
+
+        Returns:
+            bytes: WAV audio data
+        """
+        try:
+            self.audio_logger.log_audio_start("Text-to-speech conversion")
+            start_time = time.time()
+
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+
+            if self.audio_cache is not None:
+                audio_bytes = self.audio_cache.get(text, language)
+                if audio_bytes is not None:
+                    self.logger.debug("[CACHE] TTS cache hit for '%s...'", text[:50])
+                    return audio_bytes
+
+            audio_bytes = self._synthesize(text, language)
+
+            if self.audio_cache is not None:
+                self.audio_cache.put(text, language, audio_bytes)
+
+            self.audio_logger.log_audio_success("Text-to-speech conversion", time.time() - start_time)
+            self.logger.info(f"📝 Converted text length: {len(text)} characters")
+            return audio_bytes
+
+        except Exception as e:
+            self.audio_logger.log_audio_error("Text-to-speech conversion", e)
+            raise
+
+    def _synthesize(self, text, language):
+        """Run the Piper voice and wrap its PCM as WAV bytes, bypassing audio_cache"""
+        voice = self._get_voice(language)
+        pcm = b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+        return self._to_wav(pcm, voice.config.sample_rate)
+
+    def text_to_speech_file(self, text, output_path=None, language="en"):
+        """
+        Convert text to speech and save as WAV file
+
+        Args:
+            text (str): Text to convert to speech
+            output_path (str, optional): Path to save the audio file
+            language (str): Language code (default: "en")
+
+        Returns:
+            str: Path to the generated audio file
+        """
+        audio_bytes = self.text_to_speech_bytes(text, language=language)
+
+        if output_path is None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+                output_path = temp_file.name
+
+        with open(output_path, "wb") as audio_file:
+            audio_file.write(audio_bytes)
+
+        self.logger.info(f"🎵 Generated audio file: {output_path} ({len(audio_bytes)} bytes)")
+        return output_path
+
+    def text_to_speech_base64(self, text, language="en"):
+        """
+        Convert text to speech and return as base64 encoded string
+
+        Args:
+            text (str): Text to convert to speech
+            language (str): Language code (default: "en")
+
+        Returns:
+            str: Base64 encoded WAV audio data
+        """
+        try:
+            # Chained so the raw audio is released before the encoded bytes are copied into a str
+            return base64.b64encode(self.text_to_speech_bytes(text, language=language)).decode('ascii')
+
+        except Exception as e:
+            self.logger.error(f"❌ Error converting text to base64 audio: {str(e)}")
+            raise
+
+    def combine_audio(self, clips):
+        """Join WAV clips into one WAV by concatenating their PCM frames under a single header"""
+        if not clips:
+            return b""
+
+        frames = []
+        sample_rate = None
+        for clip in clips:
+            with wave.open(io.BytesIO(clip), "rb") as wav_file:
+                sample_rate = sample_rate or wav_file.getframerate()
+                frames.append(wav_file.readframes(wav_file.getnframes()))
+        return self._to_wav(b"".join(frames), sample_rate)
+
+    def get_available_languages(self):
+        """Return languages with a loaded voice"""
+        return {
+            language: Config.AVAILABLE_TTS_LANGUAGES.get(language, language)
+            for language in self.voices
+        }
+
+    def set_language(self, language="en"):
+        """Set default language for TTS"""
+        if language in self.voices:
+            self.language = language
+            self.logger.info(f"🌐 Language set to: {language}")
+        else:
+            self.logger.warning(f"⚠️ Language '{language}' has no Piper voice. Keeping '{self.language}'.")
+
+    def get_model_info(self):
+        """Get information about the TTS service"""
+        return {
+            "engine": "Piper (local ONNX)",
+            "cost": "Free",
+            "internet_required": False,
+            "voices": dict(Config.PIPER_VOICES),
+            "supported_languages": len(self.voices),
+            "current_language": self.language,
+            "device": "cuda" if self.use_cuda else "cpu",
+            "output_format": "WAV",
+            "quality": "Good",
+            "usage_limits": "None (runs locally)"
+        }
+
+    def health_check(self):
+        """Perform a health check on the TTS service"""
+        try:
+            self.logger.info("🔍 Performing TTS health check...")
+            # Synthesize directly: a cached clip would pass even with a broken voice
+            audio_bytes = self._synthesize("Health check test", self.language)
+
+            if len(audio_bytes) > 0:
+                self.logger.info("✅ TTS health check passed")
+                return True
+            self.logger.error("❌ TTS health check failed: No audio generated")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"❌ TTS health check failed: {str(e)}")
+            return False
+
+
 class SpeechService:
     """Combined Speech Service for STT and TTS operations"""
 
@@ -185,6 +444,8 @@ class SpeechService:
         self.stt = stt_service
         self.tts = tts_service
         self.logger = get_logger("speech_service")
+        # Synthesizes response sentences concurrently with each other and with transcription
+        self._executor = ThreadPoolExecutor(max_workers=Config.TTS_PIPELINE_WORKERS, thread_name_prefix="speech_pipeline")
         self.logger.info("🎯 SpeechService initialized with STT and TTS services")
 
     def voice_to_voice(self, audio_input, response_text=None, language="en"):
@@ -203,6 +464,16 @@ class SpeechService:
             self.logger.info("🔄 Starting voice-to-voice pipeline")
             pipeline_start = time.time()
 
+            # The response text doesn't depend on the transcription, so start synthesizing it
+            # (one task per sentence) before transcribing: total time ~ max(STT, TTS), not the sum
+            tts_futures = []
+            if response_text:
+                self.logger.info("🎵 Starting Text-to-Speech conversion alongside transcription")
+                tts_futures = [
+                    self._executor.submit(self.tts.text_to_speech_bytes, sentence, language)
+                    for sentence in SENTENCE_BOUNDARY.split(response_text) if sentence.strip()
+                ]
+
             # Step 1: Speech to Text
             self.logger.info("📝 Step 1: Speech-to-Text conversion")
             if isinstance(audio_input, str):
@@ -217,10 +488,13 @@ class SpeechService:
             audio_response = None
             audio_response_size = 0
             
-            if response_text:
-                self.logger.info("🎵 Step 2: Text-to-Speech conversion")
-                audio_response = self.tts.text_to_speech_base64(response_text, language=language)
-                audio_response_size = len(audio_response) if audio_response else 0
+            if tts_futures:
+                self.logger.info("🎵 Step 2: Collecting Text-to-Speech audio")
+                # The joined clip is a temporary, freed before the encoded bytes are copied into a str
+                audio_response = base64.b64encode(
+                    self.tts.combine_audio([future.result() for future in tts_futures])
+                ).decode('ascii')
+                audio_response_size = len(audio_response)
 
             pipeline_time = time.time() - pipeline_start
 
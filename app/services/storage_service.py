@@ -1,12 +1,41 @@
 # app/services/storage_service.py
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 import time
 import os
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from types import MappingProxyType
+from typing import NamedTuple
 from config import Config
 from logger_config import get_logger
 
+# Extensions the app accepts, mapped to the content type stored on the S3 object
+CONTENT_TYPES = MappingProxyType({
+    'pdf': 'application/pdf',
+    'txt': 'text/plain',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'wav': 'audio/wav',
+    'mp3': 'audio/mpeg',
+    'flac': 'audio/flac',
+    'ogg': 'audio/ogg'
+})
+
+class FileEntry(NamedTuple):
+    """One object from list_files(): a plain tuple, so a 1000-key listing stays cheap"""
+    key: str
+    size: int
+    last_modified: str
+    etag: str
+
 class S3Storage:
     """Enhanced S3 Storage service with logging and error handling"""
     
@@ -14,6 +43,16 @@ class S3Storage:
         self.logger = get_logger("s3_storage")
         self.s3 = None
         self.bucket = Config.AWS_BUCKET_NAME
+        # Large files go up as concurrent multipart parts instead of one sequential stream
+        self.transfer_config = TransferConfig(
+            multipart_threshold=Config.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=Config.S3_MULTIPART_CHUNKSIZE,
+            io_chunksize=Config.S3_IO_CHUNKSIZE,
+            max_concurrency=Config.S3_MAX_CONCURRENCY,
+            use_threads=True
+        )
+        # (monotonic time, result) of the last health check; swapped as one tuple
+        self._health = (float('-inf'), False)
         self._initialize_s3()
     
     def _initialize_s3(self):
@@ -26,12 +65,23 @@ class S3Storage:
             if not Config.AWS_ACCESS_KEY or not Config.AWS_SECRET_KEY:
                 raise ValueError("AWS credentials not found in configuration")
             
-            # Initialize S3 client
+            # Initialize S3 client. Without acceleration the regional endpoint is pinned, so requests
+            # never take a redirect from the global endpoint; with it they enter at the nearest AWS edge
             self.s3 = boto3.client(
                 's3',
                 aws_access_key_id=Config.AWS_ACCESS_KEY,
                 aws_secret_access_key=Config.AWS_SECRET_KEY,
-                region_name=Config.AWS_REGION
+                region_name=Config.AWS_REGION,
+                endpoint_url=None if Config.AWS_USE_ACCELERATION else f"https://s3.{Config.AWS_REGION}.amazonaws.com",
+                # botocore's default pool of 10 would make parts and concurrent requests queue for (or
+                # discard and re-handshake) connections; adaptive retries back off on throttling
+                config=BotoConfig(
+                    max_pool_connections=max(Config.S3_MAX_POOL_CONNECTIONS, Config.S3_MAX_CONCURRENCY * Config.S3_UPLOAD_WORKERS),
+                    retries={'max_attempts': 10, 'mode': 'adaptive'},
+                    tcp_keepalive=True,
+                    signature_version='s3v4',
+                    s3={'use_accelerate_endpoint': Config.AWS_USE_ACCELERATION, 'addressing_style': 'virtual'}
+                )
             )
             
             # Test connection
@@ -48,20 +98,23 @@ class S3Storage:
     def _test_connection(self):
         """Test S3 connection"""
         try:
-            # List buckets to test connection
-            response = self.s3.list_buckets()
-            bucket_names = [bucket['Name'] for bucket in response['Buckets']]
-            
-            if self.bucket not in bucket_names:
-                self.logger.warning(f"⚠️  Bucket '{self.bucket}' not found in available buckets: {bucket_names}")
+            # HEAD the one bucket we use: checks credentials and access in one small request,
+            # without listing (or needing permission to list) every bucket in the account
+            try:
+                self.s3.head_bucket(Bucket=self.bucket)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('404', 'NoSuchBucket'):
+                    raise
+                self.logger.warning(f"⚠️  Bucket '{self.bucket}' not found")
             else:
                 self.logger.info(f"✅ Bucket '{self.bucket}' verified")
+            self._health = (time.monotonic(), True)
                 
         except Exception as e:
             self.logger.error(f"❌ S3 connection test failed: {str(e)}")
             raise
     
-    def upload_file(self, file_obj, filename, folder="documents"):
+    def upload_file(self, file_obj, filename, folder="documents", file_size=None, compute_hash=True):
         """
         Upload file to S3 with logging
         
@@ -69,22 +122,64 @@ class S3Storage:
             file_obj: File object to upload
             filename (str): Name of the file
             folder (str): Folder/prefix in S3
+            file_size (int, optional): Size in bytes when the caller knows it; otherwise measured
+                by seeking
+            compute_hash (bool): Key the upload by its SHA-256 and skip it when that object
+                already exists with the same digest
         
         Returns:
             dict: Upload result with status and details
         """
+        spooled = None
         try:
-            # Create full key with folder and timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            key = f"{folder}/{timestamp}_{filename}"
-            
-            self.logger.info(f"📤 Uploading file: {filename} to {key}")
             start_time = time.time()
             
-            # Get file size for logging
-            file_obj.seek(0, 2)  # Seek to end
-            file_size = file_obj.tell()
-            file_obj.seek(0)  # Reset to beginning
+            if not file_obj.seekable():
+                # boto3 can only multipart (and we can only hash) a seekable stream: spool it,
+                # in memory up to S3_UPLOAD_SPOOL_MAX and on disk beyond, in 1 MiB copies
+                spooled = tempfile.SpooledTemporaryFile(max_size=Config.S3_UPLOAD_SPOOL_MAX)
+                shutil.copyfileobj(file_obj, spooled, length=1024 * 1024)
+                spooled.seek(0)
+                file_obj = spooled
+            
+            # Get file size for logging and the object metadata (the stream is seekable from here on)
+            if file_size is None:
+                file_obj.seek(0, 2)  # Seek to end
+                file_size = file_obj.tell()
+                file_obj.seek(0)  # Reset to beginning
+            
+            metadata = {
+                'original_name': filename,
+                'upload_timestamp': timestamp,
+                'file_size': str(file_size)
+            }
+            
+            if compute_hash:
+                # Content-addressed key: re-uploading the same document is a HEAD instead of a PUT.
+                # The digest prefix also spreads keys over S3's prefix partitions
+                sha256 = self._sha256(file_obj)
+                metadata['sha256'] = sha256
+                key = f"{folder}/{sha256[:16]}_{filename}"
+                # Trust the stored digest, not just the key: S3's ETag is only an MD5 for single-part
+                # uploads, while the sha256 metadata is set on every object written here
+                if self._stored_sha256(key) == sha256:
+                    self.logger.info(f"♻️  Identical file already stored, skipping upload: {key}")
+                    return {
+                        "success": True,
+                        "key": key,
+                        "bucket": self.bucket,
+                        "size": file_size,
+                        "upload_time": time.time() - start_time,
+                        "url": f"s3://{self.bucket}/{key}",
+                        "deduplicated": True
+                    }
+            else:
+                # Random key prefix: same-second uploads of one filename can't overwrite each other.
+                # The upload time is kept in the object metadata
+                key = f"{folder}/{uuid.uuid4().hex[:8]}_{filename}"
+            
+            self.logger.info(f"📤 Uploading file: {filename} to {key}")
             
             # Upload file
             self.s3.upload_fileobj(
@@ -93,12 +188,9 @@ class S3Storage:
                 key,
                 ExtraArgs={
                     'ContentType': self._get_content_type(filename),
-                    'Metadata': {
-                        'original_name': filename,
-                        'upload_timestamp': timestamp,
-                        'file_size': str(file_size)
-                    }
-                }
+                    'Metadata': metadata
+                },
+                Config=self.transfer_config
             )
             
             upload_time = time.time() - start_time
@@ -129,6 +221,49 @@ class S3Storage:
                 "error": "Upload failed",
                 "details": str(e)
             }
+        finally:
+            if spooled is not None:
+                spooled.close()
+    
+    def upload_files(self, items, folder="documents"):
+        """
+        Upload several files concurrently over the shared (thread-safe) S3 client
+        
+        Args:
+            items (list): (file_obj, filename) pairs
+            folder (str): Folder/prefix in S3
+        
+        Returns:
+            list: upload_file() results, in the order of items
+        """
+        # S3_UPLOAD_WORKERS files at a time, each with S3_MAX_CONCURRENCY parts in flight:
+        # together they fit the client's connection pool
+        with ThreadPoolExecutor(max_workers=Config.S3_UPLOAD_WORKERS, thread_name_prefix="s3_bulk_upload") as executor:
+            futures = [executor.submit(self.upload_file, file_obj, filename, folder) for file_obj, filename in items]
+            results = [future.result() for future in futures]
+        
+        uploaded = sum(result["success"] for result in results)
+        self.logger.info(f"📦 Bulk upload finished: {uploaded}/{len(results)} files succeeded")
+        return results
+    
+    @staticmethod
+    def _sha256(file_obj):
+        """SHA-256 hex digest of a seekable stream, read in 1 MiB blocks, leaving it rewound"""
+        # hashlib's SHA-256 is OpenSSL's, which uses the SHA-NI extensions where the CPU has them
+        digest = hashlib.sha256()
+        for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+            digest.update(block)
+        file_obj.seek(0)
+        return digest.hexdigest()
+    
+    def _stored_sha256(self, key):
+        """SHA-256 recorded on an existing object, or None if it is missing (or can't be checked)"""
+        try:
+            return self.s3.head_object(Bucket=self.bucket, Key=key).get('Metadata', {}).get('sha256')
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+                self.logger.warning(f"⚠️  Could not check for existing object {key}: {str(e)}")
+            return None
     
     def get_file(self, key):
         """
@@ -138,7 +273,7 @@ class S3Storage:
             key (str): S3 object key
         
         Returns:
-            dict: File data and metadata
+            dict: File data and metadata; body is a readable stream (a spooled temp file for large objects)
         """
         try:
             self.logger.info(f"📥 Downloading file: {key}")
@@ -146,16 +281,25 @@ class S3Storage:
             
             # Get object
             response = self.s3.get_object(Bucket=self.bucket, Key=key)
+            file_size = response['ContentLength']
+            body = response['Body']
+            
+            if file_size > Config.S3_MULTIPART_THRESHOLD:
+                # One stream is bounded by a single TCP window; fetch large objects as concurrent
+                # byte-range GETs instead (small objects keep the single GET, with no extra round trip)
+                body.close()
+                body = tempfile.SpooledTemporaryFile(max_size=Config.S3_DOWNLOAD_SPOOL_MAX)
+                self.s3.download_fileobj(self.bucket, key, body, Config=self.transfer_config)
+                body.seek(0)
             
             download_time = time.time() - start_time
-            file_size = response['ContentLength']
             
             self.logger.info(f"✅ File downloaded successfully in {download_time:.2f}s")
             self.logger.info(f"📊 File size: {self._format_file_size(file_size)}")
             
             return {
                 "success": True,
-                "body": response['Body'],
+                "body": body,
                 "metadata": response.get('Metadata', {}),
                 "content_type": response.get('ContentType', ''),
                 "size": file_size,
@@ -191,26 +335,26 @@ class S3Storage:
             limit (int): Maximum number of files to return
         
         Returns:
-            dict: List of files with metadata
+            dict: List of FileEntry tuples (key, size, last_modified, etag) and their count
         """
         try:
             self.logger.info(f"📋 Listing files in folder: {folder}")
             
-            response = self.s3.list_objects_v2(
+            # Follow continuation tokens past ListObjectsV2's 1000-key page, stopping at limit
+            pages = self.s3.get_paginator('list_objects_v2').paginate(
                 Bucket=self.bucket,
                 Prefix=folder,
-                MaxKeys=limit
+                PaginationConfig={'MaxItems': limit, 'PageSize': min(limit, 1000)}
             )
             
             files = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    files.append({
-                        "key": obj['Key'],
-                        "size": obj['Size'],
-                        "last_modified": obj['LastModified'].isoformat(),
-                        "etag": obj['ETag']
-                    })
+            for page in pages:
+                files.extend([
+                    FileEntry(obj['Key'], obj['Size'], obj['LastModified'].isoformat(), obj['ETag'])
+                    for obj in page.get('Contents', ())
+                ])
+                if len(files) >= limit:
+                    break
             
             self.logger.info(f"✅ Found {len(files)} files")
             
@@ -238,40 +382,68 @@ class S3Storage:
         Returns:
             dict: Deletion result
         """
+        result = self.delete_files([key])
+        if result["success"]:
+            return {
+                "success": True,
+                "key": key
+            }
+        return {
+            "success": False,
+            "error": "Delete operation failed",
+            "details": result.get("details") or result["errors"][0].get("Message", "")
+        }
+    
+    def delete_files(self, keys):
+        """
+        Delete several files from S3, up to 1000 keys per request
+        
+        Args:
+            keys (list): S3 object keys
+        
+        Returns:
+            dict: Deletion result with the number of keys deleted and any per-key errors
+        """
         try:
-            self.logger.info(f"🗑️  Deleting file: {key}")
+            self.logger.info(f"🗑️  Deleting {len(keys)} files")
             
-            self.s3.delete_object(Bucket=self.bucket, Key=key)
+            errors = []
+            for start in range(0, len(keys), 1000):
+                # Quiet mode: the response lists only the keys that failed
+                response = self.s3.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={
+                        'Objects': [{'Key': key} for key in keys[start:start + 1000]],
+                        'Quiet': True
+                    }
+                )
+                errors.extend(response.get('Errors', ()))
             
-            self.logger.info(f"✅ File deleted successfully: {key}")
+            if errors:
+                self.logger.error(f"❌ Failed to delete {len(errors)} of {len(keys)} files")
+            else:
+                self.logger.info(f"✅ Deleted {len(keys)} files successfully")
             
             return {
-                "success": True,
-                "key": key
+                "success": not errors,
+                "deleted": len(keys) - len(errors),
+                "errors": errors
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to delete file {key}: {str(e)}")
+            self.logger.error(f"❌ Failed to delete files: {str(e)}")
             return {
                 "success": False,
                 "error": "Delete operation failed",
+                "deleted": 0,
+                "errors": [],
                 "details": str(e)
             }
     
     def _get_content_type(self, filename):
-        """Get content type based on file extension"""
-        extension = filename.lower().split('.')[-1]
-        content_types = {
-            'pdf': 'application/pdf',
-            'txt': 'text/plain',
-            'doc': 'application/msword',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'wav': 'audio/wav',
-            'mp3': 'audio/mpeg',
-            'flac': 'audio/flac',
-            'ogg': 'audio/ogg'
-        }
-        return content_types.get(extension, 'application/octet-stream')
+        """Get content type based on file extension, falling back to the mimetypes registry"""
+        extension = os.path.splitext(filename)[1][1:].lower()
+        return CONTENT_TYPES.get(extension) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
     
     def _format_file_size(self, size_bytes):
         """Format file size in human-readable format"""
@@ -285,15 +457,21 @@ class S3Storage:
         return f"{size_bytes:.1f}{size_names[i]}"
     
     def health_check(self):
-        """Perform a health check on S3 service"""
+        """Perform a health check on S3 service (cached for Config.S3_HEALTH_CACHE_SECONDS)"""
+        checked_at, healthy = self._health
+        now = time.monotonic()
+        if now - checked_at < Config.S3_HEALTH_CACHE_SECONDS:
+            return healthy
+        
         try:
-            # Try to list buckets
-            self.s3.list_buckets()
+            self.s3.head_bucket(Bucket=self.bucket)
             self.logger.info("✅ S3 storage health check passed")
-            return True
+            healthy = True
         except Exception as e:
             self.logger.error(f"❌ S3 storage health check failed: {str(e)}")
-            return False
+            healthy = False
+        self._health = (now, healthy)
+        return healthy
     
     def get_storage_info(self):
         """Get storage service information"""
@@ -301,5 +479,6 @@ class S3Storage:
             "provider": "AWS S3",
             "bucket": self.bucket,
             "region": Config.AWS_REGION,
+            "transfer_acceleration": Config.AWS_USE_ACCELERATION,
             "status": "active" if self.health_check() else "error"
         }
\ No newline at end of file
@@ -0,0 +1,73 @@
+# app/services/text_chunker.py
+from langchain.schema import Document
+
+class FastChunker:
+    """
+    Delimiter-aware text chunker with overlap, a drop-in for RecursiveCharacterTextSplitter.split_documents
+
+    Each chunk boundary is found with one C-level str.rfind per delimiter over the
+    current window, instead of splitting the whole text into pieces and re-merging them in Python.
+    """
+
+    # Tried in order: paragraph, line, sentence, word
+    DEFAULT_DELIMITERS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+    def __init__(self, chunk_size=1000, chunk_overlap=200, delimiters=DEFAULT_DELIMITERS):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.delimiters = delimiters
+        # Delimiter lengths are fixed per instance; precompute them once for the split loop
+        self._delimiter_lengths = tuple((delimiter, len(delimiter)) for delimiter in delimiters)
+        # Don't cut in the first half of a window, so chunks stay reasonably full
+        self.min_cut = max(chunk_size // 2, chunk_overlap + 1)
+
+    def split_text(self, text):
+        """Split text into chunks of at most chunk_size characters"""
+        chunks = []
+        append = chunks.append
+        rfind = text.rfind
+        find = text.find
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        min_cut = self.min_cut
+        delimiter_lengths = self._delimiter_lengths
+        text_length = len(text)
+        start = 0
+
+        while start < text_length:
+            end = start + chunk_size
+
+            if end < text_length:
+                # Break after the strongest delimiter in the back part of the window
+                for delimiter, delimiter_length in delimiter_lengths:
+                    cut = rfind(delimiter, start + min_cut, end)
+                    if cut != -1:
+                        end = cut + delimiter_length
+                        break
+            else:
+                end = text_length
+
+            chunk = text[start:end].strip()
+            if chunk:
+                append(chunk)
+
+            if end >= text_length:
+                break
+
+            # Step back by the overlap, starting on a word boundary, while always moving forward
+            next_start = max(end - chunk_overlap, start + 1)
+            space = find(" ", next_start, end)
+            start = space + 1 if space != -1 else next_start
+
+        return chunks
+
+    def split_documents(self, documents):
+        """Split documents into chunk Documents, copying each source document's metadata"""
+        return [
+            Document(page_content=chunk, metadata=dict(document.metadata))
+            for document in documents
+            for chunk in self.split_text(document.page_content)
+        ]
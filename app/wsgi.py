@@ -0,0 +1,12 @@
+# app/wsgi.py
+"""
+WSGI entry point for production: gunicorn -c app/gunicorn.conf.py wsgi:application
+
+The gthread workers serve requests on real OS threads, so CPU-bound model work (embedding,
+Whisper, TTS) in one request doesn't stall the rest of the worker. gevent/eventlet workers are
+not supported: gunicorn monkey-patches threading for them, turning the in-process model threads
+and executors into greenlets that block the worker's hub.
+"""
+from main import app
+
+application = app
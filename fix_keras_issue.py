@@ -4,6 +4,11 @@
 import subprocess
 import sys
 import os
+from importlib.metadata import version, PackageNotFoundError
+
+# Distributions this fix needs: tf-keras (the main Keras 3 fix), langchain-huggingface
+# (alternative embeddings) and sentence-transformers
+REQUIRED_PACKAGES = ("tf-keras", "langchain-huggingface", "sentence-transformers")
 
 def run_command(command):
     """Run a command and return success status"""
@@ -16,6 +21,16 @@ def run_command(command):
         print(f"Error: {e.stderr}")
         return False
 
+def missing_packages(packages):
+    """Return the distributions that are not installed, reading installed metadata (no pip call)"""
+    missing = []
+    for package in packages:
+        try:
+            print(f"✅ {package} {version(package)} already installed")
+        except PackageNotFoundError:
+            missing.append(package)
+    return missing
+
 def check_installation(package_name, import_name=None):
     """Check if a package is installed and can be imported"""
     if import_name is None:
@@ -33,17 +48,12 @@ def main():
     print("🔧 Fixing Keras 3 Compatibility Issue for LangChain/HuggingFace...")
     print("=" * 60)
     
-    # Step 1: Install tf-keras (main fix)
-    print("\n1. Installing tf-keras (Keras compatibility fix)...")
-    success1 = run_command("pip install tf-keras")
-    
-    # Step 2: Install langchain-huggingface (alternative)
-    print("\n2. Installing langchain-huggingface (alternative embeddings)...")
-    success2 = run_command("pip install langchain-huggingface")
-    
-    # Step 3: Upgrade sentence-transformers
-    print("\n3. Upgrading sentence-transformers...")
-    success3 = run_command("pip install sentence-transformers --upgrade")
+    # Steps 1-3: Install tf-keras, langchain-huggingface and sentence-transformers, only where
+    # missing, in one pip run so the resolver runs once (and not at all on a ready environment)
+    print("\n1-3. Checking tf-keras, langchain-huggingface and sentence-transformers...")
+    missing = missing_packages(REQUIRED_PACKAGES)
+    if missing:
+        run_command(f'"{sys.executable}" -m pip install {" ".join(missing)}')
     
     # Step 4: Set TensorFlow to use CPU only (avoid GPU issues)
     print("\n4. Setting TensorFlow environment variables...")
@@ -82,24 +92,29 @@ def main():
         print(f"❌ HuggingFace embeddings error: {str(e)}")
         embeddings_ok = False
     
-    # Test 4: Test alternative embeddings
-    print("\nTest 4: Alternative embeddings test")
-    try:
-        from langchain_huggingface import HuggingFaceEmbeddings as HFEmbeddings
-        alt_embeddings = HFEmbeddings(
-            model_name="all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
-        alt_test_result = alt_embeddings.embed_query("test")
-        if alt_test_result and len(alt_test_result) > 0:
-            print("✅ Alternative embeddings are working!")
-            alt_embeddings_ok = True
-        else:
-            print("❌ Alternative embeddings test failed")
+    # Test 4: Test alternative embeddings - only needed (and its ~90MB model only loaded again)
+    # when the original embeddings didn't already pass
+    alt_embeddings_ok = False
+    if tf_keras_ok and embeddings_ok:
+        print("\nTest 4: Alternative embeddings test skipped (original embeddings working)")
+    else:
+        print("\nTest 4: Alternative embeddings test")
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings as HFEmbeddings
+            alt_embeddings = HFEmbeddings(
+                model_name="all-MiniLM-L6-v2",
+                model_kwargs={'device': 'cpu'}
+            )
+            alt_test_result = alt_embeddings.embed_query("test")
+            if alt_test_result and len(alt_test_result) > 0:
+                print("✅ Alternative embeddings are working!")
+                alt_embeddings_ok = True
+            else:
+                print("❌ Alternative embeddings test failed")
+                alt_embeddings_ok = False
+        except Exception as e:
+            print(f"❌ Alternative embeddings error: {str(e)}")
             alt_embeddings_ok = False
-    except Exception as e:
-        print(f"❌ Alternative embeddings error: {str(e)}")
-        alt_embeddings_ok = False
     
     print("\n" + "=" * 60)
     print("📊 RESULTS SUMMARY")
@@ -0,0 +1,36 @@
+# scripts/freeze_env.py
+# Run this script to freeze .env into app/_env_frozen.py for production starts:
+#   python scripts/freeze_env.py [path/to/.env]
+
+import os
+import sys
+from pprint import pformat
+from dotenv import dotenv_values
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_PATH = os.path.join(ROOT_DIR, 'app', '_env_frozen.py')
+
+def freeze_env(env_path, output_path=OUTPUT_PATH):
+    """Parse the .env file once and write it out as a plain dict literal"""
+    values = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+    
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        output_file.write("# app/_env_frozen.py\n")
+        output_file.write("# Generated by scripts/freeze_env.py - do not edit or commit\n\n")
+        output_file.write(f"ENV = {pformat(values)}\n")
+    
+    return values
+
+def main():
+    env_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT_DIR, '.env')
+    
+    if not os.path.exists(env_path):
+        print(f"❌ .env file not found: {env_path}")
+        sys.exit(1)
+    
+    values = freeze_env(env_path)
+    print(f"✅ Froze {len(values)} variables from {env_path} into {OUTPUT_PATH}")
+    print("ℹ️  Used at startup when ENVIRONMENT=production")
+
+if __name__ == "__main__":
+    main()
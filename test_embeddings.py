@@ -3,6 +3,11 @@
 Simple test script to verify FREE HuggingFace embeddings work correctly
 Run this to test your embedding setup: python test_embeddings.py
 """
+import os
+import sys
+
+# The app's modules use flat imports from app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
 
 def test_embeddings():
     """Test the exact embedding syntax used in the application"""
@@ -12,12 +17,13 @@ def test_embeddings():
     
     try:
         # Import the exact same way as in the application
-        from langchain.embeddings import HuggingFaceEmbeddings
+        from models.st_embeddings import SentenceTransformerEmbeddings
         print("✅ Import successful")
         
-        # Create embeddings using the exact syntax from vector_store.py
+        # Create embeddings the way vector_store.py's SentenceTransformer option does: one shared
+        # model, texts encoded by SentenceTransformer.encode in batches of 64 (no per-text loop)
         print("📦 Creating embeddings with: all-MiniLM-L6-v2")
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        embeddings = SentenceTransformerEmbeddings("all-MiniLM-L6-v2", device="cpu", batch_size=64)
         print("✅ Embeddings created successfully")
         
         # Test with sample text
@@ -58,7 +64,6 @@ def test_embeddings():
         print("🔒 Privacy: Full")
         
         # Clean up test files
-        import os
         import shutil
         if os.path.exists("test_vector_db"):
             shutil.rmtree("test_vector_db")